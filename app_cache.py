@@ -0,0 +1,14 @@
+import os
+
+# 磁盘缓存根目录，可通过环境变量 PET_HOME_CACHE_DIR 修改
+CACHE_ROOT = os.environ.get(
+    "PET_HOME_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+
+def get_cache_dir(name):
+    """返回（并按需创建）指定用途的缓存子目录"""
+    path = os.path.join(CACHE_ROOT, name)
+    os.makedirs(path, exist_ok=True)
+    return path
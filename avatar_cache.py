@@ -0,0 +1,34 @@
+import hashlib
+
+import streamlit as st
+
+from profiling import profiled
+from resume_pdf import make_avatar_thumbnail
+
+MAX_SESSION_AVATARS = 4  # 每个会话最多保留几张处理过的头像（来回切换照片时不必重新处理）
+
+
+@profiled("头像缩略图")
+def get_avatar_thumbnail(uploaded_file, state_key="avatar_thumbnail"):
+    """按上传内容的SHA-256在会话中缓存头像缩略图，预览和导出PDF共用，同一张照片只解码一次
+
+    只在本会话内、内容完全相同时复用；头像不写入磁盘，也不与其他会话的照片比对。
+    """
+    if uploaded_file is None:
+        return None
+    data = uploaded_file.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    thumbnails = st.session_state.get(state_key)
+    if not isinstance(thumbnails, dict):
+        thumbnails = st.session_state[state_key] = {}
+    if digest in thumbnails:
+        return thumbnails[digest]
+    try:
+        thumbnail = make_avatar_thumbnail(data)
+    except Exception as e:
+        st.warning(f"头像处理失败：{str(e)}")
+        return None
+    while len(thumbnails) >= MAX_SESSION_AVATARS:
+        thumbnails.pop(next(iter(thumbnails)))
+    thumbnails[digest] = thumbnail
+    return thumbnail
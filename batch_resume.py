@@ -0,0 +1,297 @@
+"""批量导出简历：CSV/JSONL 名单进，ZIP 打包的 PDF 出
+
+命令行用法：
+    python batch_resume.py roster.csv -o resumes.zip --workers 4
+    python batch_resume.py roster.csv --avatar-dir photos/   # 名单的 avatar_path 列为 photos/ 下的照片
+
+avatar_path 列只在命令行指定了 --avatar-dir 时使用，且只能指向该目录下的文件；页面上传的名单忽略这一列。
+页面上传的名单最多处理 MAX_WEB_RECORDS 条，所有会话共用一个进程池，ZIP 写到临时文件而不是内存。
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from app_cache import get_cache_dir
+from resume_pdf import RESUME_FIELDS, get_resume_styles, render_resume_pdf
+
+# 名单中缺失的字段使用与页面表单相同的默认值
+RESUME_DEFAULTS = {
+    "name": "",
+    "nickname": "",
+    "birth_date": datetime.date(2000, 1, 1),
+    "gender": "女",
+    "education": "本科",
+    "work_exp": 0,
+    "salary_min": 8000,
+    "salary_max": 12000,
+    "grad_info": "2024届 某某大学 某某专业",
+    "job_intention": "新媒体运营",
+    "job_city": ["北京", "上海"],
+    "arrival_time": "随时到岗",
+    "phone": "",
+    "email": "",
+    "address": "",
+    "id_card": "",
+    "skills": [],
+    "experience": "",
+    "intro": ""
+}
+LIST_FIELDS = ("job_city", "skills")
+INT_FIELDS = ("work_exp", "salary_min", "salary_max")
+
+# 页面上传的名单单次最多处理的条数，超出部分记为错误
+MAX_WEB_RECORDS = 500
+# 页面导出共用的工作进程数
+WEB_WORKERS = 2
+# 页面导出的临时ZIP超过这个时间（秒）还在就清掉
+TEMP_ZIP_MAX_AGE = 3600
+
+
+class RecordError(str):
+    """read_records 中读不出来的一条记录：作为该条的错误信息，不再向外抛异常"""
+
+
+def read_records(stream, file_name):
+    """按扩展名逐条读取名单记录（.csv 或 .jsonl），stream 为文本流
+
+    格式有误的行产出 RecordError（错误信息），由 export_batch 记入失败列表，其余记录照常导出。
+    """
+    if file_name.lower().endswith(".jsonl"):
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield RecordError(f"不是合法的JSON：{e}")
+                continue
+            yield record if isinstance(record, dict) else RecordError("每行应为一个JSON对象")
+    else:
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                yield next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield RecordError(f"CSV格式有误：{e}")
+
+
+def decode_roster(data):
+    """名单文件字节转文本：先按 UTF-8（可带BOM）解码，失败再按 GB18030（兼容GBK，Excel 另存的中文CSV常用）"""
+    for encoding in ("utf-8-sig", "gb18030"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("无法识别名单文件的编码，请另存为 UTF-8 或 GBK 编码后重新上传")
+
+
+def record_to_fields(record):
+    """把一条名单记录规范化为 render_resume_pdf 需要的字段字典"""
+    fields = {}
+    for key in RESUME_FIELDS:
+        value = record.get(key)
+        if value is None or value == "":
+            fields[key] = RESUME_DEFAULTS[key]
+        elif key in LIST_FIELDS and isinstance(value, str):
+            # CSV中的列表字段用中英文逗号或顿号分隔
+            fields[key] = [item.strip() for item in re.split(r"[,，、]", value) if item.strip()]
+        elif key in INT_FIELDS:
+            fields[key] = int(value)
+        elif key == "birth_date" and isinstance(value, str):
+            fields[key] = datetime.date.fromisoformat(value)
+        else:
+            fields[key] = value
+    return fields
+
+
+def _warm_up_worker():
+    """进程池初始化：每个工作进程只注册一次字体、构建一次样式"""
+    get_resume_styles()
+
+
+def resolve_avatar_path(avatar_path, avatar_dir):
+    """名单中的照片路径（相对 avatar_dir）转为绝对路径；不在 avatar_dir 内时抛出 ValueError"""
+    base = os.path.realpath(avatar_dir)
+    path = os.path.realpath(os.path.join(base, avatar_path))
+    if os.path.commonpath([base, path]) != base:
+        raise ValueError(f"照片路径不在照片目录内：{avatar_path}")
+    return path
+
+
+def _render_record(index, record, avatar_dir=None):
+    """工作进程中渲染一份简历，返回 (序号, 文件名, PDF字节或None, 错误信息)"""
+    try:
+        fields = record_to_fields(record)
+        avatar_bytes = None
+        if avatar_dir and record.get("avatar_path"):
+            with open(resolve_avatar_path(record["avatar_path"], avatar_dir), "rb") as f:
+                avatar_bytes = f.read()
+        warnings = []
+        pdf = render_resume_pdf(fields, avatar_bytes, on_warning=warnings.append)
+        name = re.sub(r'[\\/:*?"<>|]', "_", fields["name"] or "简历")
+        return index, f"{index + 1:05d}_{name}.pdf", pdf, "；".join(warnings)
+    except Exception as e:
+        return index, None, None, str(e)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool():
+    """页面导出共用的进程池（首次调用时创建）
+
+    工作进程用 spawn 方式启动：Streamlit 服务进程里有多个线程，fork 出的子进程可能继承被锁住的锁。
+    所有会话共用这一个池，同时点导出的人再多，渲染进程也只有 WEB_WORKERS 个。
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ProcessPoolExecutor(
+                max_workers=WEB_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up_worker
+            )
+        return _shared_pool
+
+
+def _discard_shared_pool(pool):
+    """工作进程异常退出后进程池不能再用，丢掉它，下次导出时重建"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is pool:
+            _shared_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def export_batch(records, zip_target, workers=None, on_progress=None, avatar_dir=None,
+                 executor=None, max_records=None):
+    """把名单渲染成PDF并写入ZIP
+
+    records 可以是任意可迭代对象（逐条读取，不会一次性载入），zip_target 为文件路径或二进制流。
+    avatar_dir 为 None 时忽略名单中的 avatar_path 列。
+    executor 为 None 时新建一个进程池，用完关闭；传入时使用该进程池（不关闭），workers 为其进程数。
+    max_records 不为 None 时只处理前 max_records 条，之后的记录记为一条错误。
+    同时在途的任务数有上限，完成一份就写入一份，内存中不会堆积所有PDF。
+    返回 (成功份数, 失败列表)。
+    """
+    workers = workers or os.cpu_count() or 1
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up_worker) as executor:
+            return export_batch(records, zip_target, workers, on_progress, avatar_dir, executor, max_records)
+
+    max_in_flight = workers * 2
+    done_count = 0
+    errors = []
+
+    with zipfile.ZipFile(zip_target, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        pending = set()
+
+        def drain(return_when):
+            nonlocal pending, done_count
+            finished, pending = wait(pending, return_when=return_when)
+            for future in finished:
+                index, file_name, pdf, message = future.result()
+                if pdf is None:
+                    errors.append((index + 1, message))
+                    continue
+                zf.writestr(file_name, pdf)
+                done_count += 1
+                if message:
+                    errors.append((index + 1, message))
+                if on_progress is not None:
+                    on_progress(done_count)
+
+        for index, record in enumerate(records):
+            if max_records is not None and index >= max_records:
+                errors.append((index + 1, f"名单超过{max_records}条，从这一条起未导出"))
+                break
+            if isinstance(record, RecordError):
+                errors.append((index + 1, str(record)))
+                continue
+            pending.add(executor.submit(_render_record, index, record, avatar_dir))
+            if len(pending) >= max_in_flight:
+                drain(FIRST_COMPLETED)
+        if pending:
+            drain(ALL_COMPLETED)
+
+        if errors:
+            zf.writestr("errors.txt", "\n".join(f"第{row}条：{message}" for row, message in sorted(errors)))
+
+    return done_count, errors
+
+
+def _remove_stale_zips(directory):
+    cutoff = time.time() - TEMP_ZIP_MAX_AGE
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def export_batch_file(data, file_name, on_progress=None):
+    """页面上传用：名单文件字节进，临时ZIP文件路径出（不读取服务器上的照片，avatar_path 列被忽略）
+
+    使用共用进程池，最多处理 MAX_WEB_RECORDS 条；ZIP 写在缓存目录的临时文件里，
+    调用方读取后应删除（遗留的文件在之后的导出中按 TEMP_ZIP_MAX_AGE 清理）。
+    编码无法识别或工作进程意外退出时抛出 ValueError。返回 (ZIP路径, 成功份数, 失败列表)。
+    """
+    stream = io.StringIO(decode_roster(data), newline="")
+    directory = get_cache_dir("batch_exports")
+    _remove_stale_zips(directory)
+    fd, path = tempfile.mkstemp(suffix=".zip", dir=directory)
+    pool = get_shared_pool()
+    try:
+        with os.fdopen(fd, "wb") as output:
+            done_count, errors = export_batch(
+                read_records(stream, file_name), output, WEB_WORKERS, on_progress,
+                executor=pool, max_records=MAX_WEB_RECORDS
+            )
+    except BrokenProcessPool:
+        os.remove(path)
+        _discard_shared_pool(pool)
+        raise ValueError("生成进程意外退出，请重试")
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, done_count, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量生成简历PDF并打包为ZIP")
+    parser.add_argument("roster", help="名单文件（.csv 或 .jsonl），列名与简历字段一致")
+    parser.add_argument("-o", "--output", default="resumes.zip", help="输出ZIP路径")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="工作进程数，默认为CPU核数")
+    parser.add_argument("--avatar-dir", default=None, help="照片目录：名单 avatar_path 列的照片只从这里读取，不指定时不加照片")
+    args = parser.parse_args(argv)
+
+    with open(args.roster, encoding="utf-8-sig", newline="") as stream:
+        done_count, errors = export_batch(
+            read_records(stream, args.roster),
+            args.output,
+            workers=args.workers,
+            avatar_dir=args.avatar_dir,
+            on_progress=lambda n: print(f"\r已生成 {n} 份", end="", flush=True)
+        )
+    print(f"\n完成：{done_count} 份 -> {args.output}")
+    for row, message in errors:
+        print(f"第{row}条：{message}")
+
+
+if __name__ == "__main__":
+    main()
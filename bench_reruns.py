@@ -0,0 +1,318 @@
+"""页面重跑耗时基准：基于 streamlit.testing.v1.AppTest，离线运行
+
+每个脚本在独立的子进程中测量，冷启动才是真正的冷启动（模块导入、字体、数据缓存都从头开始），
+峰值内存也按脚本分开统计。每个子进程依次测：首次运行（cold）、原样重跑（warm）、脚本化交互
+（图集翻页、切换剧集、选择餐厅、导出PDF）。结果汇总为 p50/p95 写入 JSON，可与旧基线对比。
+
+命令行用法：
+    python bench_reruns.py                                  # 全部脚本，结果写入 bench_baseline.json
+    python bench_reruns.py photo.py top.py -n 3             # 指定脚本和子进程数
+    python bench_reruns.py -o new.json --compare bench_baseline.json   # 与基线对比，p50变慢超过阈值时返回1
+"""
+import argparse
+import datetime
+import glob
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPTS = [
+    "main.py", "first.py", "music.py", "photo.py", "video.py",
+    "nanning_food_dashboard.py", "professional.py", "top.py"
+]
+WARM_RUNS = 3  # 每个子进程里重跑、每种交互各测几次
+SCRIPT_TIMEOUT = 60
+
+
+# --------------------------
+# 离线桩：HTTP 请求统一返回一张"有效图片"，其余网络连接直接拒绝
+# --------------------------
+def install_network_stub():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    def fake_send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "image/jpeg"
+        response.headers["Content-Length"] = "0"
+        response._content = b""
+        response.url = request.url
+        response.request = request
+        return response
+
+    def refuse_connect(self, address):
+        raise OSError(f"基准测试离线运行，拒绝连接 {address}")
+
+    HTTPAdapter.send = fake_send
+    socket.socket.connect = refuse_connect
+
+
+# --------------------------
+# 脚本化交互：每个函数完成一次交互并重跑，i 为第几次
+# --------------------------
+def _click(label):
+    def step(at, i):
+        next(b for b in at.button if b.label == label).click().run()
+    return step
+
+
+def _switch_episode(at, i):
+    at.button[(i + 1) % len(at.button)].click().run()
+
+
+def _select_restaurant(key=None):
+    def step(at, i):
+        box = at.selectbox(key=key) if key else at.selectbox[0]
+        box.select(box.options[(i + 2) % len(box.options)]).run()
+    return step
+
+
+def _switch_tab(label):
+    def step(at, i):
+        at.radio(key="pet_home_active_tab").set_value(label).run()
+    return step
+
+
+def _export_pdf(name_key="name_input", button_label="📥 导出简历", job_key="export_job_id"):
+    def step(at, i):
+        from export_jobs import get_export_queue
+
+        # 每次换一个姓名，避开PDF缓存，测的是真正的排版
+        at.text_input(key=name_key).input(f"基准测试{i}").run()
+        next(b for b in at.button if b.label == button_label).click().run()
+        job = get_export_queue().get(at.session_state[job_key])
+        job.future.result(timeout=SCRIPT_TIMEOUT)
+        at.run()
+    return step
+
+
+def _return_to_resume_tab(at, i):
+    # 切走再切回简历分区，表单内容应原样保留
+    at.radio(key="pet_home_active_tab").set_value("首页").run()
+    at.radio(key="pet_home_active_tab").set_value("宠物简历服务").run()
+    name = at.text_input(key="pet_resume_name").value
+    if not name.startswith("基准测试"):
+        raise AssertionError(f"切换分区后简历内容丢失：{name!r}")
+
+
+INTERACTIONS = {
+    "music.py": {"下一首": _click("▶▶ 下一首"), "随机播放": _click("🔀 随机播放")},
+    "photo.py": {"下一张": _click("下一张"), "上一张": _click("上一张")},
+    "pages/3_宠物照片展示.py": {"下一张": _click("下一张"), "上一张": _click("上一张")},
+    "video.py": {"切换剧集": _switch_episode},
+    "pages/5_宠物趣味视频.py": {"切换剧集": _switch_episode},
+    "nanning_food_dashboard.py": {"选择餐厅": _select_restaurant()},
+    "pages/2_南宁宠物美食推荐.py": {"选择餐厅": _select_restaurant()},
+    "professional.py": {"导出PDF": _export_pdf()},
+    "pages/4_宠物简历服务项目.py": {"导出PDF": _export_pdf()},
+    "top.py": {
+        "切到美食": _switch_tab("南宁宠物美食推荐"),
+        "选择餐厅": _select_restaurant("pet_food_selected_rest"),
+        "切到照片": _switch_tab("宠物照片展示"),
+        "下一张": _click("下一张"),
+        "切到简历": _switch_tab("宠物简历服务"),
+        "简历导出PDF": _export_pdf("pet_resume_name", "生成PDF简历", "pet_resume_export_job_id"),
+        "切到视频": _switch_tab("宠物趣味视频"),
+        "切回简历": _return_to_resume_tab
+    }
+}
+
+
+def _peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure_script(script, warm_runs=WARM_RUNS):
+    """在当前进程中测一个脚本，返回各项耗时样本（秒）"""
+    from streamlit.testing.v1 import AppTest
+
+    samples = {"cold": [], "warm": [], "interactions": {}}
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=SCRIPT_TIMEOUT)
+
+    samples["cold"].append(_timed(at.run))
+    if at.exception:
+        samples["error"] = at.exception[0].message
+        return samples
+
+    for _ in range(warm_runs):
+        samples["warm"].append(_timed(at.run))
+
+    for name, step in INTERACTIONS.get(script, {}).items():
+        times = samples["interactions"].setdefault(name, [])
+        for i in range(warm_runs):
+            times.append(_timed(lambda: step(at, i)))
+            if at.exception:
+                samples["error"] = f"{name}：{at.exception[0].message}"
+                return samples
+    return samples
+
+
+def run_worker(script):
+    """子进程入口：测一个脚本，把样本和峰值内存以JSON打印到标准输出"""
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore")
+    sys.path.insert(0, ROOT)
+    install_network_stub()
+    samples = measure_script(script)
+    samples["peak_rss_kb"] = _peak_rss_kb()
+    print(json.dumps(samples, ensure_ascii=False))
+
+
+def _percentile(values, pct):
+    """最近秩百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(values):
+    return {
+        "n": len(values),
+        "p50_ms": round(_percentile(values, 50) * 1000, 1) if values else None,
+        "p95_ms": round(_percentile(values, 95) * 1000, 1) if values else None
+    }
+
+
+def bench_script(script, processes):
+    """起 processes 个子进程测同一个脚本，合并样本"""
+    merged = {"cold": [], "warm": [], "interactions": {}}
+    peak_rss = []
+    error = None
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for _ in range(processes):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", script],
+            cwd=ROOT, env=env, capture_output=True, text=True, encoding="utf-8"
+        )
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "子进程异常退出"
+            break
+        samples = json.loads(lines[-1])
+        merged["cold"] += samples["cold"]
+        merged["warm"] += samples["warm"]
+        for name, times in samples["interactions"].items():
+            merged["interactions"].setdefault(name, []).extend(times)
+        if samples.get("peak_rss_kb") is not None:
+            peak_rss.append(samples["peak_rss_kb"])
+        if samples.get("error"):
+            error = samples["error"]
+            break
+
+    result = {
+        "cold": summarize(merged["cold"]),
+        "warm": summarize(merged["warm"]),
+        "interactions": {name: summarize(times) for name, times in merged["interactions"].items()},
+        "peak_rss_kb": max(peak_rss) if peak_rss else None
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+def compare(results, baseline, threshold, min_delta_ms=5.0):
+    """p50 比基线慢 threshold 倍以上（且至少慢 min_delta_ms，忽略毫秒级抖动）的条目"""
+    regressions = []
+    for script, current in results.items():
+        old = baseline.get("results", {}).get(script)
+        if not old:
+            continue
+        pairs = [("cold", current["cold"], old.get("cold")), ("warm", current["warm"], old.get("warm"))]
+        pairs += [
+            (f"交互:{name}", stats, old.get("interactions", {}).get(name))
+            for name, stats in current["interactions"].items()
+        ]
+        for label, new_stats, old_stats in pairs:
+            if not old_stats or not old_stats.get("p50_ms") or new_stats.get("p50_ms") is None:
+                continue
+            slower = new_stats["p50_ms"] - old_stats["p50_ms"]
+            if new_stats["p50_ms"] > old_stats["p50_ms"] * threshold and slower >= min_delta_ms:
+                regressions.append((script, label, old_stats["p50_ms"], new_stats["p50_ms"]))
+    return regressions
+
+
+def _print_row(script, label, stats):
+    print(f"{script:<32} {label:<14} p50 {stats['p50_ms']:>8} ms   p95 {stats['p95_ms']:>8} ms   n={stats['n']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用 AppTest 测各页面脚本的冷启动、重跑和交互耗时")
+    parser.add_argument("scripts", nargs="*", help="要测的脚本，默认为全部页面脚本")
+    parser.add_argument("-n", "--processes", type=int, default=5, help="每个脚本起几个子进程（冷启动样本数）")
+    parser.add_argument("-o", "--output", default="bench_baseline.json", help="结果JSON路径")
+    parser.add_argument("--compare", help="对比的基线JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50超过基线多少倍算退化")
+    parser.add_argument("--min-delta", type=float, default=5.0, help="p50至少慢多少毫秒才算退化")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker)
+        return 0
+
+    scripts = args.scripts or DEFAULT_SCRIPTS + sorted(
+        os.path.relpath(p, ROOT).replace(os.sep, "/") for p in glob.glob(os.path.join(ROOT, "pages", "*.py"))
+    )
+    results = {}
+    for script in scripts:
+        result = bench_script(script, args.processes)
+        results[script] = result
+        if result.get("error"):
+            print(f"{script:<32} 出错：{result['error']}")
+        if result["cold"]["n"]:
+            _print_row(script, "cold", result["cold"])
+        if result["warm"]["n"]:
+            _print_row(script, "warm", result["warm"])
+        for name, stats in result["interactions"].items():
+            _print_row(script, name, stats)
+        if result["peak_rss_kb"] is not None:
+            print(f"{script:<32} 峰值内存 {result['peak_rss_kb'] / 1024:.1f} MB")
+
+    report = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processes": args.processes,
+            "warm_runs": WARM_RUNS
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"结果已写入：{args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta)
+        for script, label, old_ms, new_ms in regressions:
+            print(f"退化：{script} {label} {old_ms} ms -> {new_ms} ms")
+        if regressions:
+            return 1
+        print("与基线相比没有明显退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
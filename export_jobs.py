@@ -0,0 +1,173 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from resume_pdf import ExportCancelled, get_resume_pdf
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+STATUS_TEXT = {
+    QUEUED: "排队中",
+    RUNNING: "正在生成",
+    DONE: "已完成",
+    FAILED: "生成失败",
+    CANCELLED: "已取消"
+}
+
+
+class ExportJob:
+    """一次PDF导出任务：状态、进度、结果都在这里，由后台线程更新，页面只读取"""
+
+    def __init__(self, fields, avatar_bytes=None):
+        self.job_id = uuid.uuid4().hex
+        self.fields = fields
+        self.avatar_bytes = avatar_bytes
+        self.status = QUEUED
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.warnings = []
+        self.created_at = time.time()
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def cancel(self):
+        """排队中的任务直接取消；生成中的任务在排完当前元素后停止"""
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.status = CANCELLED
+
+    def run(self):
+        if self._cancel_event.is_set():
+            self.status = CANCELLED
+            return
+        self.status = RUNNING
+        try:
+            self.result = get_resume_pdf(
+                self.fields,
+                self.avatar_bytes,
+                on_warning=self.warnings.append,
+                on_progress=self._set_progress,
+                cancel_event=self._cancel_event
+            )
+            self.progress = 1.0
+            self.status = DONE
+        except ExportCancelled:
+            self.status = CANCELLED
+        except Exception as e:
+            self.error = str(e)
+            self.status = FAILED
+
+    def _set_progress(self, value):
+        self.progress = value
+
+
+class ExportQueueFull(Exception):
+    """排队和生成中的任务已达上限"""
+
+
+class ExportQueue:
+    """进程内共享的导出队列：固定大小的线程池，多个会话同时导出时排队，不占用页面脚本线程"""
+
+    def __init__(self, max_workers=2, max_jobs=200):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-export")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fields, avatar_bytes=None):
+        """提交导出任务；排队和生成中的任务已达 max_jobs 时抛出 ExportQueueFull"""
+        job = ExportJob(fields, avatar_bytes)
+        with self._lock:
+            if len(self._jobs) >= self.max_jobs:
+                # 只淘汰已结束的旧任务（结果随之释放），排队和生成中的任务不受影响
+                for old_id in [old_id for old_id, old_job in self._jobs.items() if old_job.finished]:
+                    del self._jobs[old_id]
+                    if len(self._jobs) < self.max_jobs:
+                        break
+                if len(self._jobs) >= self.max_jobs:
+                    raise ExportQueueFull(f"已有 {self.max_jobs} 个导出任务在排队或生成中")
+            self._jobs[job.job_id] = job
+        job.future = self._executor.submit(job.run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_export_queue():
+    """所有会话共用的导出队列"""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = ExportQueue()
+        return _default_queue
+
+
+def start_export(state_key, fields, avatar_bytes=None):
+    """提交导出任务并把任务编号记到会话状态；队列已满时提示稍后再试，返回None"""
+    try:
+        job = get_export_queue().submit(fields, avatar_bytes)
+    except ExportQueueFull:
+        st.warning("⏳ 当前导出的人太多了，请稍后再试")
+        return None
+    st.session_state[state_key] = job.job_id
+    return job
+
+
+def render_export_status(state_key, file_name, poll_interval=0.5):
+    """显示当前会话导出任务的进度；任务未结束时只在局部片段里轮询，不重跑整个页面"""
+    job_id = st.session_state.get(state_key)
+    job = get_export_queue().get(job_id) if job_id else None
+    if job is None:
+        return
+
+    polling = not job.finished
+
+    def export_status():
+        if job.status in (QUEUED, RUNNING):
+            st.progress(job.progress, text=f"{STATUS_TEXT[job.status]}… {int(job.progress * 100)}%")
+            if st.button("⏹️ 取消导出", key=f"export_cancel_{state_key}", use_container_width=True):
+                job.cancel()
+            return
+
+        if polling:
+            # 任务刚结束：整页刷新一次，停止轮询
+            st.rerun()
+
+        for message in job.warnings:
+            st.warning(message)
+        if job.status == DONE:
+            st.download_button(
+                label="下载PDF简历",
+                data=job.result,
+                file_name=file_name,
+                mime="application/pdf",
+                on_click="ignore",
+                use_container_width=True
+            )
+            st.success("✅ 简历已生成，点击按钮即可下载！")
+        elif job.status == CANCELLED:
+            st.info("已取消本次导出")
+        else:
+            st.error(f"PDF生成失败：{job.error}")
+            st.error("❌ PDF生成失败，请检查输入内容或稍后重试")
+
+    st.fragment(export_status, run_every=poll_interval if polling else None)()
@@ -1,49 +1,21 @@
 import streamlit as st
 import pandas as pd
+from profiling import render_profile_panel, section, start_profiling
+from theme import apply_theme  # 样式在 themes/ 目录，每个进程只编译一次
 
 # 页面配置：马卡龙风格
 st.set_page_config(page_title="动物数字档案", layout="wide", initial_sidebar_state="collapsed")
+start_profiling("first")  # 地址加 ?profile=1 时在侧边栏显示各段落耗时
 
 # 自定义CSS：马卡龙色系（粉/蓝/黄/绿柔和色调）
-st.markdown("""
-    <style>
-    .stApp {
-        background-color: #f9f7f8;  /* 马卡龙浅底 */
-        color: #4a4a4a;  /* 柔和文字色 */
-    }
-    .stMetric {
-        background-color: #f0f8fb;  /* 浅蓝底 */
-        padding: 15px;
-        border-radius: 12px;
-        border-left: 5px solid #88c9e8;  /* 马卡龙蓝 */
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-    }
-    .stDataFrame {
-        background-color: #fff9f2;  /* 浅黄底 */
-        border-radius: 12px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-    }
-    .stCode {
-        background-color: #fef0f5 !important;  /* 浅粉底 */
-        border-radius: 12px;
-        border: 1px solid #f8d7e3;  /* 马卡龙粉 */
-    }
-    .css-1d391kg {
-        background-color: #f5f9f7;  /* 浅绿底 */
-    }
-    .stProgress > div > div {
-        background-color: #a8e6cf;  /* 马卡龙绿 */
-    }
-    h1, h2, h3 {
-        color: #6b8e9e;  /* 马卡龙主色 */
-    }
-    </style>
-""", unsafe_allow_html=True)
+section("页面样式")
+apply_theme("first")
 
 # 标题区域（动物主题）
 st.title("🐾 动物 小橘 数字档案")
 
 # 基础信息模块
+section("基础信息")
 st.header("📋 基础信息")
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -56,6 +28,7 @@ with col3:
     st.text("饲养员: 李星")
 
 # 能力矩阵模块（适配动物行为能力）
+section("能力矩阵")
 st.header("🐱 行为能力矩阵")
 skill_cols = st.columns(3)
 with skill_cols[0]:
@@ -70,6 +43,7 @@ st.subheader("社会化训练进度")
 st.progress(85)  # 对应85%的进度
 
 # 日常记录模块（替换为动物日常）
+section("日常记录")
 st.header("📅 日常行为记录")
 task_data = pd.DataFrame({
     "日期": ["2025-01-20", "2025-01-25", "2025-01-30"],
@@ -80,6 +54,7 @@ task_data = pd.DataFrame({
 st.dataframe(task_data, use_container_width=True)
 
 # 行为分析代码（适配动物主题）
+section("代码片段")
 st.header("🐾 行为分析代码片段")
 code_content = """
 def analyze_cat_behavior(behavior_data):
@@ -110,4 +85,6 @@ st.markdown("""
 
 # 互动提议
 st.markdown("---")
-st.write("爱护动物，人人有责")
\ No newline at end of file
+st.write("爱护动物，人人有责")
+
+render_profile_panel()
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import pickle
+import threading
+from fnmatch import fnmatch
+from weakref import WeakKeyDictionary
+
+import reportlab
+from reportlab import rl_config
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFace, TTEncoding
+
+from app_cache import get_cache_dir
+from profiling import profiled
+
+# 中文字体候选列表：按顺序探测，找到第一个可用字体即停止
+FONT_CONFIGS = [
+    {"name": "SimHei", "paths": ["C:/Windows/Fonts/simhei.ttf", "C:/Windows/Fonts/msyh.ttc"]},
+    {"name": "PingFang", "paths": ["/System/Library/Fonts/PingFang.ttc", "/Library/Fonts/Arial Unicode.ttf"]},
+    {"name": "DejaVuSans", "paths": ["/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"]}
+]
+FALLBACK_FONT = "Helvetica"
+
+_lock = threading.Lock()
+_font_name = None
+
+
+def _cache_path(path):
+    """字体文件路径+修改时间+大小+reportlab版本共同决定缓存文件名，字体更新后自动失效"""
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{reportlab.Version}"
+    return os.path.join(get_cache_dir("fonts"), hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".pickle")
+
+
+def _pdf_scale(units_per_em):
+    if units_per_em == 1000:
+        return lambda x: x
+    factor = 1000 / units_per_em
+    return lambda x: x * factor
+
+
+def _load_cached_font(name, path):
+    """从磁盘缓存恢复已解析的字体度量，跳过TTF/TTC解析"""
+    cache_file = _cache_path(path)
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with open(cache_file, "rb") as f:
+            face_state = pickle.load(f)
+        face = TTFontFace.__new__(TTFontFace)
+        face.__dict__.update(face_state)
+        face._pdfScale = _pdf_scale(face.unitsPerEm)
+
+        font = TTFont.__new__(TTFont)
+        font.fontName = name
+        font.face = face
+        font.encoding = TTEncoding()
+        font.state = WeakKeyDictionary()
+        font._asciiReadable = rl_config.ttfAsciiReadable
+        font.shapable = not any(fnmatch(name, pattern) for pattern in rl_config.unShapedFontGlob)
+        return font
+    except Exception:
+        # 缓存损坏或reportlab内部结构变化时，回退为重新解析
+        return None
+
+
+def _save_cached_font(font, path):
+    """把解析后的字体度量写入磁盘缓存（先写临时文件再替换，避免并发写坏）"""
+    face_state = dict(font.face.__dict__)
+    face_state.pop("_pdfScale", None)  # lambda无法序列化，加载时按unitsPerEm重建
+    cache_file = _cache_path(path)
+    tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            pickle.dump(face_state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.unlink(tmp_file)
+
+
+def _load_font(name, path):
+    font = _load_cached_font(name, path)
+    if font is None:
+        font = TTFont(name, path)
+        _save_cached_font(font, path)
+    return font
+
+
+@profiled("注册中文字体")
+def register_chinese_font():
+    """注册中文字体（每个进程只解析、注册一次，线程安全），返回可用的字体名"""
+    global _font_name
+    if _font_name is not None:
+        return _font_name
+
+    with _lock:
+        if _font_name is not None:
+            return _font_name
+
+        for config in FONT_CONFIGS:
+            if config["name"] in pdfmetrics.getRegisteredFontNames():
+                _font_name = config["name"]
+                return _font_name
+            for path in config["paths"]:
+                if os.path.exists(path):
+                    try:
+                        pdfmetrics.registerFont(_load_font(config["name"], path))
+                        _font_name = config["name"]
+                        return _font_name
+                    except Exception:
+                        continue
+
+        _font_name = FALLBACK_FONT
+        return _font_name
@@ -0,0 +1,289 @@
+"""南宁美食仪表盘的数据层
+
+数据以列式 Parquet 文件存放（restaurants / time_data / price_trend 三张表），读取时内存映射，
+按类型、人均消费的筛选条件下推到 Parquet 行组统计信息，只解码命中的数据；筛选结果只读取图表和地图
+用到的列，推荐菜品等详情列在查看某家餐厅时才读取那一行所在的行组。
+data/nanning_food.json 是可手工编辑的小数据源，对应的 Parquet 文件不存在或过期时自动重建。
+
+命令行用法：
+    python food_data.py build                      # 由 JSON 重建 Parquet
+    python food_data.py build --synthetic 100000   # 生成10万家模拟餐厅，用于压测
+"""
+import argparse
+import json
+import os
+import random
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import streamlit as st
+
+from app_cache import CACHE_ROOT
+from food_map import RestaurantGridIndex
+from profiling import profiled
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+# 可手工编辑的小数据源
+FOOD_DATA_PATH = os.path.join(DATA_DIR, "nanning_food.json")
+# Parquet 数据目录：优先使用环境变量或 data/nanning_food/ 中随项目发布的文件，否则由 JSON 生成到缓存目录
+FOOD_STORE_DIR = os.environ.get("PET_HOME_FOOD_STORE", os.path.join(DATA_DIR, "nanning_food"))
+GENERATED_STORE_DIR = os.path.join(CACHE_ROOT, "food_store")
+
+TABLES = ("restaurants", "time_data", "price_trend")
+ROW_GROUP_SIZE = 64 * 1024
+# 餐厅表按类型、人均消费排序存放，这一列记录原始顺序，读出后按它还原
+ORDER_COLUMN = "序号"
+# 筛选结果读取的列（图表、地图、下拉框用到的），其余列只在查看详情时读取
+QUERY_COLUMNS = ["餐厅", "类型", "评分", "人均消费(元)", "latitude", "longitude"]
+# 详情下拉框最多列出的餐厅数，避免一次下发上万个选项
+MAX_DETAIL_OPTIONS = 200
+
+
+def _table_path(store_dir, table):
+    return os.path.join(store_dir, f"{table}.parquet")
+
+
+def write_store(restaurants, time_data, price_trend, store_dir):
+    """把三张表写成 Parquet：餐厅按类型、人均消费排序，使行组的最小/最大值统计可用于谓词下推
+
+    排序前的顺序记在 ORDER_COLUMN 列里，页面上的餐厅列表、价格走势仍按数据源的顺序显示。
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    restaurants = restaurants.assign(**{ORDER_COLUMN: range(len(restaurants))})
+    restaurants = restaurants.sort_values(["类型", "人均消费(元)"], kind="stable")
+    tables = {
+        "restaurants": restaurants,
+        "time_data": time_data,
+        # 价格走势按长表存放（餐厅, 月份, 价格），任意多家餐厅都不需要加列
+        "price_trend": price_trend
+    }
+    for table, frame in tables.items():
+        tmp_path = f"{_table_path(store_dir, table)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(
+            pa.Table.from_pandas(frame, preserve_index=False),
+            tmp_path,
+            row_group_size=ROW_GROUP_SIZE
+        )
+        os.replace(tmp_path, _table_path(store_dir, table))
+
+
+def build_store_from_json(json_path=FOOD_DATA_PATH, store_dir=GENERATED_STORE_DIR):
+    """由 JSON 数据源生成 Parquet 数据目录"""
+    with open(json_path, encoding="utf-8") as f:
+        raw = json.load(f)
+    trend = pd.DataFrame(raw["price_trend"]).melt(id_vars="月份", var_name="餐厅", value_name="价格")
+    write_store(
+        pd.DataFrame(raw["restaurants"]),
+        pd.DataFrame(raw["time_data"]),
+        trend[["餐厅", "月份", "价格"]],
+        store_dir
+    )
+    return store_dir
+
+
+def build_synthetic_store(count, store_dir, seed=0):
+    """生成指定数量的模拟餐厅（罗文大道周边随机坐标、12个月价格），用于压测"""
+    rng = random.Random(seed)
+    types = ["中餐", "快餐", "粉店", "烧烤", "甜品"]
+    names = [f"餐厅{i:06d}" for i in range(count)]
+    prices = [rng.randint(8, 80) for _ in range(count)]
+    restaurants = pd.DataFrame({
+        "餐厅": names,
+        "类型": [rng.choice(types) for _ in range(count)],
+        "评分": [round(rng.uniform(3.0, 5.0), 1) for _ in range(count)],
+        "人均消费(元)": prices,
+        "latitude": [22.80 + rng.uniform(-0.08, 0.08) for _ in range(count)],
+        "longitude": [108.30 + rng.uniform(-0.12, 0.12) for _ in range(count)],
+        "推荐菜品": [["招牌菜"] for _ in range(count)],
+        "拥挤程度(%)": [rng.randint(10, 95) for _ in range(count)]
+    })
+    with open(FOOD_DATA_PATH, encoding="utf-8") as f:
+        time_data = pd.DataFrame(json.load(f)["time_data"])
+    months = [f"{m}月" for m in range(1, 13)]
+    trend = pd.DataFrame({
+        "餐厅": [name for name in names for _ in months],
+        "月份": months * count,
+        "价格": [price + rng.randint(-2, 2) for price in prices for _ in months]
+    })
+    write_store(restaurants, time_data, trend, store_dir)
+    return store_dir
+
+
+def _store_complete(store_dir):
+    return all(os.path.exists(_table_path(store_dir, table)) for table in TABLES)
+
+
+def get_store_dir():
+    """返回可用的 Parquet 数据目录；缺表的目录视为不存在，JSON 数据源比生成的文件新时先重建"""
+    if _store_complete(FOOD_STORE_DIR):
+        return FOOD_STORE_DIR
+    if not _store_complete(GENERATED_STORE_DIR) or min(_store_version(GENERATED_STORE_DIR)) < os.path.getmtime(FOOD_DATA_PATH):
+        build_store_from_json(FOOD_DATA_PATH, GENERATED_STORE_DIR)
+    return GENERATED_STORE_DIR
+
+
+def _store_version(store_dir):
+    """各表文件修改时间，参与缓存键，文件更新后自动重新加载"""
+    return tuple(os.path.getmtime(_table_path(store_dir, table)) for table in TABLES)
+
+
+def _read(store_dir, table, columns=None, filters=None):
+    return pq.read_table(_table_path(store_dir, table), columns=columns, filters=filters, memory_map=True)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_food_summary(store_dir, version):
+    """全表汇总（餐厅数、类型列表、价格区间、用餐时段），每个数据版本只计算一次"""
+    restaurants = _read(store_dir, "restaurants", columns=["类型", "人均消费(元)"])
+    prices = restaurants["人均消费(元)"]
+    return {
+        "restaurant_count": restaurants.num_rows,
+        "types": sorted(pc.unique(restaurants["类型"]).to_pylist()),
+        "price_bounds": (pc.min(prices).as_py(), pc.max(prices).as_py()),
+        "time_data": _read(store_dir, "time_data").to_pandas().set_index("时段")
+    }
+
+
+@profiled("加载美食汇总")
+def load_food_data():
+    """南宁美食数据汇总（整个进程按数据版本只计算一次，各页面共用，只读）"""
+    store_dir = get_store_dir()
+    return _load_food_summary(store_dir, _store_version(store_dir))
+
+
+def _restaurant_filters(types, price_range):
+    """筛选条件转为 Parquet 谓词；types、price_range 为 None 表示不限（不做任何过滤）"""
+    filters = []
+    if types is not None:
+        filters.append(("类型", "in", list(types)))
+    if price_range is not None:
+        filters.append(("人均消费(元)", ">=", price_range[0]))
+        filters.append(("人均消费(元)", "<=", price_range[1]))
+    return filters or None
+
+
+class RestaurantQuery(dict):
+    """筛选结果及其聚合；地图用的网格空间索引（"spatial_index"）第一次取用时才建立"""
+
+    def __init__(self, df):
+        super().__init__(
+            restaurants=df,
+            # 评分排行（柱状图）只展示前10名
+            score_ranking=df.nlargest(10, "评分").set_index("餐厅")["评分"],
+            consume_by_type=df.groupby("类型")["人均消费(元)"].mean()
+        )
+        self._lock = threading.Lock()
+
+    def __missing__(self, key):
+        if key != "spatial_index":
+            raise KeyError(key)
+        # 结果在会话间共享，多个会话同时取用时只建一次
+        with self._lock:
+            if key not in self:
+                self[key] = RestaurantGridIndex(self["restaurants"])
+            return dict.__getitem__(self, key)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _query_restaurants(store_dir, version, types, price_range):
+    path = _table_path(store_dir, "restaurants")
+    ordered = ORDER_COLUMN in pq.read_schema(path).names  # 旧版本生成的数据没有这一列
+    table = _read(
+        store_dir, "restaurants",
+        columns=QUERY_COLUMNS + [ORDER_COLUMN] if ordered else QUERY_COLUMNS,
+        filters=_restaurant_filters(types, price_range)
+    )
+    if ordered:
+        table = table.sort_by(ORDER_COLUMN).drop_columns([ORDER_COLUMN])
+    return RestaurantQuery(table.to_pandas())
+
+
+@profiled("筛选餐厅")
+def query_restaurants(types=None, price_range=None):
+    """按类型、人均消费区间筛选餐厅（条件下推到 Parquet，None 表示不限），返回筛选结果及其聚合；结果只读"""
+    store_dir = get_store_dir()
+    return _query_restaurants(
+        store_dir,
+        _store_version(store_dir),
+        tuple(types) if types is not None else None,
+        tuple(price_range) if price_range is not None else None
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _load_price_trend(store_dir, version, names):
+    trend = _read(store_dir, "price_trend", filters=[("餐厅", "in", list(names))]).to_pandas()
+    wide = trend.pivot(index="月份", columns="餐厅", values="价格")
+    # 月份和餐厅都保持价格走势表中的原始顺序（与数据源中各列的顺序一致）
+    return wide.reindex(index=trend["月份"].unique(), columns=trend["餐厅"].unique())
+
+
+@profiled("价格走势")
+def load_price_trend(names):
+    """指定餐厅的12个月价格走势（宽表，一家餐厅一列）"""
+    if not names:
+        return pd.DataFrame()
+    store_dir = get_store_dir()
+    return _load_price_trend(store_dir, _store_version(store_dir), tuple(names))
+
+
+def render_food_filters(food, key_prefix):
+    """类型、人均消费筛选控件，返回筛选结果（不选类型表示不限类型；无结果时回退为全部餐厅）"""
+    col_type, col_price = st.columns(2)
+    with col_type:
+        types = st.multiselect("餐厅类型（不选表示全部）", food["types"], key=f"{key_prefix}types")
+    with col_price:
+        low, high = food["price_bounds"]
+        high = max(high, low + 1)
+        price_range = st.slider("人均消费(元)", low, high, (low, high), key=f"{key_prefix}price_range")
+
+    # 选了全部类型、价格拉满时等于不筛选：不带谓词读取，并与无结果时的回退共用一份缓存
+    if set(types) >= set(food["types"]):
+        types = None
+    if price_range == (low, high):
+        price_range = None
+    query = query_restaurants(types or None, price_range)
+    if query["restaurants"].empty:
+        st.warning("没有符合条件的餐厅，已显示全部餐厅")
+        query = query_restaurants()
+    return query
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _load_restaurant(store_dir, version, name):
+    # 先只读餐厅名这一列找到所在行组，再读取该行组的全部列
+    parquet = pq.ParquetFile(_table_path(store_dir, "restaurants"), memory_map=True)
+    for group in range(parquet.num_row_groups):
+        names = parquet.read_row_group(group, columns=["餐厅"])["餐厅"]
+        position = pc.index(names, name).as_py()
+        if position >= 0:
+            return parquet.read_row_group(group).slice(position, 1).to_pandas().iloc[0]
+    raise KeyError(name)
+
+
+@profiled("餐厅详情")
+def get_restaurant(name):
+    """按餐厅名取出一行详情（含推荐菜品、拥挤程度等筛选结果中没有的列）"""
+    store_dir = get_store_dir()
+    return _load_restaurant(store_dir, _store_version(store_dir), name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成南宁美食仪表盘的 Parquet 数据")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--synthetic", type=int, default=0, help="生成指定数量的模拟餐厅")
+    parser.add_argument("-o", "--output", default=FOOD_STORE_DIR, help="输出目录")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        build_synthetic_store(args.synthetic, args.output)
+    else:
+        build_store_from_json(FOOD_DATA_PATH, args.output)
+    print(f"已生成：{args.output}")
+
+
+if __name__ == "__main__":
+    main()
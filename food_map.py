@@ -0,0 +1,140 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+import streamlit as st
+
+from profiling import profiled
+
+TILE_SIZE = 256  # Web墨卡托瓦片边长（像素）
+CELL_PX = 48  # 聚合格子边长（屏幕像素）
+MAX_POINTS = 2000  # 单次下发到浏览器的最多点数
+VIEWPORT_PX = (800, 500)  # 估算的地图可视区域（像素），用于裁剪视口外的点
+MIN_ZOOM, MAX_ZOOM = 3, 18
+
+
+class RestaurantGridIndex:
+    """餐厅的网格空间索引：按缩放级别把点落到固定像素大小的格子里，聚合结果按级别缓存"""
+
+    def __init__(self, df):
+        self._df = df
+        lat = np.radians(df["latitude"].to_numpy(dtype=float))
+        # 经纬度投影为Web墨卡托的归一化坐标（0~1），各缩放级别只需乘以比例尺
+        self._x = (df["longitude"].to_numpy(dtype=float) + 180.0) / 360.0
+        self._y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._df)
+
+    def center(self):
+        """数据范围的中心点 (纬度, 经度)"""
+        if self._df.empty:
+            return 22.806812, 108.203546
+        return (
+            float((self._df["latitude"].min() + self._df["latitude"].max()) / 2),
+            float((self._df["longitude"].min() + self._df["longitude"].max()) / 2)
+        )
+
+    def clusters(self, zoom):
+        """指定缩放级别的聚合结果：每个格子一行（中心坐标、数量、平均评分、单店时的店名）"""
+        with self._lock:
+            if zoom in self._levels:
+                return self._levels[zoom]
+
+        scale = TILE_SIZE * (2 ** zoom) / CELL_PX
+        cells = pd.DataFrame({
+            "cx": np.floor(self._x * scale).astype(np.int64),
+            "cy": np.floor(self._y * scale).astype(np.int64),
+            "latitude": self._df["latitude"].to_numpy(),
+            "longitude": self._df["longitude"].to_numpy(),
+            "评分": self._df["评分"].to_numpy(),
+            "餐厅": self._df["餐厅"].to_numpy()
+        })
+        grouped = cells.groupby(["cx", "cy"], sort=False).agg(
+            latitude=("latitude", "mean"),
+            longitude=("longitude", "mean"),
+            count=("餐厅", "size"),
+            rating=("评分", "mean"),
+            name=("餐厅", "first")
+        ).reset_index()
+        grouped["label"] = np.where(
+            grouped["count"] == 1,
+            grouped["name"],
+            grouped["count"].astype(str) + "家餐厅"
+        )
+        grouped["rating"] = grouped["rating"].round(1)
+
+        with self._lock:
+            self._levels[zoom] = grouped
+        return grouped
+
+    def visible_clusters(self, center, zoom, max_points=MAX_POINTS):
+        """视口（含四周各一屏的余量）内的聚合点；点数超过上限时自动换用更粗的级别"""
+        lat, lon = center
+        for level in range(zoom, MIN_ZOOM - 1, -1):
+            world = TILE_SIZE * (2 ** zoom)
+            # 可视区域（含余量）在归一化坐标中的半宽/半高
+            half_w = 1.5 * VIEWPORT_PX[0] / world
+            half_h = 1.5 * VIEWPORT_PX[1] / world
+            cx = (lon + 180.0) / 360.0
+            lat_rad = math.radians(lat)
+            cy = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0
+            scale = TILE_SIZE * (2 ** level) / CELL_PX
+            clusters = self.clusters(level)
+            in_view = clusters[
+                (clusters["cx"] >= math.floor((cx - half_w) * scale))
+                & (clusters["cx"] <= math.floor((cx + half_w) * scale))
+                & (clusters["cy"] >= math.floor((cy - half_h) * scale))
+                & (clusters["cy"] <= math.floor((cy + half_h) * scale))
+            ]
+            if len(in_view) <= max_points:
+                return in_view
+        return in_view.nlargest(max_points, "count")
+
+
+@profiled("绘制地图")
+def render_restaurant_map(index, zoom, key, center=None):
+    """用pydeck绘制聚合后的餐厅地图：下发的点数与餐厅总数无关，只取决于视口和缩放级别"""
+    zoom = st.slider("地图缩放级别", MIN_ZOOM, MAX_ZOOM, zoom, key=f"{key}zoom")
+    center = center or index.center()
+    clusters = index.visible_clusters(center, zoom)
+
+    # 半径按数量的平方根放大，单店保持固定大小
+    clusters = clusters.assign(radius=6 + 4 * np.sqrt(clusters["count"] - 1))
+    layers = [
+        pdk.Layer(
+            "ScatterplotLayer",
+            data=clusters[["latitude", "longitude", "radius", "label", "rating", "count"]],
+            get_position=["longitude", "latitude"],
+            get_radius="radius",
+            radius_units="pixels",
+            get_fill_color=[33, 158, 188, 180],
+            get_line_color=[255, 255, 255],
+            line_width_min_pixels=1,
+            stroked=True,
+            pickable=True
+        ),
+        pdk.Layer(
+            "TextLayer",
+            data=clusters[clusters["count"] > 1][["latitude", "longitude", "count"]],
+            get_position=["longitude", "latitude"],
+            get_text="count",
+            get_size=12,
+            get_color=[255, 255, 255],
+            get_alignment_baseline="'center'"
+        )
+    ]
+    st.pydeck_chart(
+        pdk.Deck(
+            layers=layers,
+            initial_view_state=pdk.ViewState(latitude=center[0], longitude=center[1], zoom=zoom),
+            tooltip={"text": "{label}\n平均评分：{rating}"},
+            map_style=None
+        ),
+        use_container_width=True
+    )
+    st.caption(f"共 {len(index)} 家餐厅，当前显示 {len(clusters)} 个点（相近餐厅已合并）")
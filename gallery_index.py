@@ -0,0 +1,380 @@
+"""宠物图库：目录下的照片建成 SQLite 索引（尺寸、图注、内容哈希），分页显示缩略图
+
+只有新增或修改过的文件（修改时间、大小变化）才会重新读取；进程运行期间用 watchdog 监听目录，
+新放进去的照片在最后一次改动 WATCH_DEBOUNCE 秒后自动加入索引。分页按路径定位（WHERE path >= 页首路径），
+不用 OFFSET，翻到后面的页也不必先数过前面的所有行。新照片入库时先按感知哈希查找近似的已有照片（photo_dedup），
+找到时直接沿用那张照片的缩略图，不再单独生成。照片目录默认为 data/gallery/，可通过环境变量 PET_HOME_GALLERY_DIR 修改。
+
+命令行用法：
+    python gallery_index.py scan                 # 增量扫描默认图库目录
+    python gallery_index.py scan D:/pets         # 扫描指定目录
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+
+import streamlit as st
+from PIL import Image
+
+from app_cache import get_cache_dir
+from image_cache import write_variant
+from photo_dedup import AHASH_DISTANCE, NEAR_DISTANCE, BKTree, compute_hashes, get_dedup_index, hamming
+from profiling import profiled
+
+GALLERY_DIR = os.environ.get(
+    "PET_HOME_GALLERY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gallery")
+)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp"}
+THUMB_WIDTH = 240
+PAGE_SIZE = 24
+WRITE_BATCH = 500
+WATCH_DEBOUNCE = 1.0  # 秒
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    caption TEXT,
+    sha1 TEXT,
+    thumb_key TEXT
+);
+"""
+COLUMNS = ("path", "mtime_ns", "size", "width", "height", "caption", "sha1", "thumb_key")
+
+
+def is_image_file(path):
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GalleryIndex:
+    """图库索引：一张照片一行，按相对路径排序分页；可被多个线程同时读写"""
+
+    def __init__(self, root=GALLERY_DIR, db_path=None, dedup=None):
+        self.root = os.path.abspath(root)
+        self.dedup = dedup  # 可选的感知哈希去重索引，新照片入库时一并登记
+        root_key = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:12]
+        self.db_path = db_path or os.path.join(get_cache_dir("gallery"), f"index_{root_key}.sqlite")
+        self.thumb_dir = get_cache_dir(os.path.join("gallery", "thumbs"))
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gallery-thumb")
+        self.indexing = False
+        self._generation = 0  # 每次写入加一，页首路径的缓存据此失效
+        self._page_starts = {}  # 每页条数 -> (generation, 页首路径列表)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+            # 旧版本建的表没有 thumb_key 列，补上（空值时缩略图按 sha1 命名）
+            if "thumb_key" not in {row["name"] for row in conn.execute("PRAGMA table_info(photos)")}:
+                conn.execute("ALTER TABLE photos ADD COLUMN thumb_key TEXT")
+
+    @contextmanager
+    def _db(self):
+        # 每次操作用独立连接，WAL模式下读不会被后台写入阻塞
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+
+    def _relpath(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _describe(self, rel, stat, pending=None):
+        """读取一张照片的尺寸（只解析文件头）、内容哈希和缩略图键，返回 (行, 去重登记项或None)
+
+        有去重索引时计算感知哈希：与已入库或 pending（本批还没写入的照片）中的照片近似时，
+        缩略图键沿用那张照片的，否则为自己的内容哈希。
+        """
+        path = os.path.join(self.root, rel)
+        with Image.open(path) as img:
+            width, height = img.size
+        caption = os.path.splitext(os.path.basename(rel))[0].replace("_", " ").replace("-", " ")
+        sha1 = _file_sha1(path)
+        thumb_key, entry = sha1, None
+        if self.dedup is not None:
+            try:
+                hashes = compute_hashes(path)
+            except Exception:
+                hashes = None  # PIL 能读尺寸但解不了码的文件，不参与去重
+            if hashes is not None:
+                thumb_key = self._similar_thumb_key(rel, hashes, pending) or sha1
+                entry = (f"gallery:{rel}", hashes, "gallery", path)
+                if pending is not None:
+                    pending.add(hashes[0], (hashes[1], thumb_key))
+        return (rel, stat.st_mtime_ns, stat.st_size, width, height, caption, sha1, thumb_key), entry
+
+    def _similar_thumb_key(self, rel, hashes, pending):
+        """近似照片的缩略图键，没有近似照片时返回 None"""
+        match, _ = self.dedup.find(hashes=hashes)
+        # 匹配到的是这张照片自己修改前的记录时不沿用（内容已经变了）
+        if match is not None and match["source"] == "gallery" and match["key"] != f"gallery:{rel}":
+            with self._db() as conn:
+                row = conn.execute(
+                    "SELECT sha1, thumb_key FROM photos WHERE path = ?", (match["key"][len("gallery:"):],)
+                ).fetchone()
+            if row is not None:
+                return row["thumb_key"] or row["sha1"]
+        if pending:
+            for _, (ahash, thumb_key) in pending.search(hashes[0], NEAR_DISTANCE):
+                if hamming(ahash, hashes[1]) <= AHASH_DISTANCE:
+                    return thumb_key
+        return None
+
+    def _walk(self):
+        stack = [self.root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and is_image_file(entry.name):
+                        yield entry
+
+    def _write(self, rows, removed=(), entries=()):
+        """写入照片记录、删除记录，并在去重索引中登记 entries（_describe 返回的登记项）"""
+        with self._write_lock, self._db() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO photos ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows
+            )
+            conn.executemany("DELETE FROM photos WHERE path = ?", [(rel,) for rel in removed])
+            self._generation += 1
+        if self.dedup is not None:
+            self.dedup.add_many(list(entries))
+            self.dedup.remove([f"gallery:{rel}" for rel in removed])
+
+    def _describe_into(self, rel, stat, rows, entries, pending):
+        try:
+            row, entry = self._describe(rel, stat, pending)
+        except Exception:
+            return  # 损坏或正在写入的文件，下次扫描再试
+        rows.append(row)
+        if entry is not None:
+            entries.append(entry)
+
+    def scan(self):
+        """增量扫描整个目录：只读取新增或修改过的文件，删除已不存在的记录；返回 (更新数, 删除数)"""
+        if not os.path.isdir(self.root):
+            return 0, 0
+        self.indexing = True
+        try:
+            with self._db() as conn:
+                known = {row["path"]: (row["mtime_ns"], row["size"]) for row in conn.execute("SELECT path, mtime_ns, size FROM photos")}
+            seen = set()
+            rows, entries, pending = [], [], BKTree()
+            updated = 0
+            for entry in self._walk():
+                rel = self._relpath(entry.path)
+                seen.add(rel)
+                stat = entry.stat()
+                if known.get(rel) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                self._describe_into(rel, stat, rows, entries, pending)
+                if len(rows) >= WRITE_BATCH:
+                    self._write(rows, entries=entries)
+                    updated += len(rows)
+                    rows, entries, pending = [], [], BKTree()
+            removed = known.keys() - seen
+            self._write(rows, removed, entries)
+            return updated + len(rows), len(removed)
+        finally:
+            self.indexing = False
+
+    def update_paths(self, paths):
+        """按文件路径增量更新（供目录监听调用）：存在且有变化的重新读取，不存在的删除"""
+        rows, removed, entries, pending = [], [], [], BKTree()
+        for path in paths:
+            if not is_image_file(path) or not os.path.abspath(path).startswith(self.root + os.sep):
+                continue
+            rel = self._relpath(path)
+            if not os.path.isfile(path):
+                removed.append(rel)
+                continue
+            stat = os.stat(path)
+            with self._db() as conn:
+                row = conn.execute("SELECT mtime_ns, size FROM photos WHERE path = ?", (rel,)).fetchone()
+            if row is not None and (row["mtime_ns"], row["size"]) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            self._describe_into(rel, stat, rows, entries, pending)
+        if rows or removed:
+            self._write(rows, removed, entries)
+
+    def count(self):
+        with self._db() as conn:
+            return conn.execute("SELECT COUNT(*) FROM photos").fetchone()[0]
+
+    def page_starts(self, page_size=PAGE_SIZE):
+        """每页第一张照片的路径；索引有写入后才重新计算（只读主键索引）"""
+        generation = self._generation
+        cached = self._page_starts.get(page_size)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        with self._db() as conn:
+            starts = [row[0] for row in conn.execute(
+                "SELECT path FROM (SELECT path, ROW_NUMBER() OVER (ORDER BY path) - 1 AS n FROM photos) "
+                "WHERE n % ? = 0 ORDER BY path",
+                (page_size,)
+            )]
+        self._page_starts[page_size] = (generation, starts)
+        return starts
+
+    def page(self, start="", page_size=PAGE_SIZE):
+        """从路径 start 开始（含）的一页照片记录，按路径排序；start 取自 page_starts"""
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT * FROM photos WHERE path >= ? ORDER BY path LIMIT ?", (start, page_size)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def thumbnail(self, row, width=THUMB_WIDTH):
+        """照片的缩略图路径（按缩略图键缓存，同一张或近似的照片换了位置也不用重新生成）"""
+        path = os.path.join(self.thumb_dir, f"{row['thumb_key'] or row['sha1']}_{width}.jpg")
+        if not os.path.exists(path):
+            write_variant(os.path.join(self.root, row["path"]), path, width)
+        return path
+
+    def warm_page(self, start, page_size=PAGE_SIZE):
+        """在后台提前生成从 start 开始的一页缩略图"""
+        for row in self.page(start, page_size):
+            self._executor.submit(self._warm_thumbnail, row)
+
+    def _warm_thumbnail(self, row):
+        try:
+            self.thumbnail(row)
+        except Exception:
+            pass
+
+
+class PathBatcher:
+    """收集改动的路径，最后一次改动 delay 秒后一起交给 callback
+
+    复制一张大照片会连续触发多次 modified 事件，合并后文件只读取一次，也不会读到写了一半的文件。
+    """
+
+    def __init__(self, callback, delay=WATCH_DEBOUNCE):
+        self.callback = callback
+        self.delay = delay
+        self._paths = set()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, paths):
+        with self._lock:
+            self._paths.update(paths)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            paths, self._paths = self._paths, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if paths:
+            self.callback(sorted(paths))
+
+
+def start_watching(index, debounce=WATCH_DEBOUNCE):
+    """用 watchdog 监听图库目录，新增、修改、删除的照片在改动停止 debounce 秒后更新索引；
+    返回 Observer（未安装 watchdog 时返回None）"""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    batcher = PathBatcher(index.update_paths, debounce)
+
+    class GalleryEventHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+                return
+            paths = [event.src_path]
+            if getattr(event, "dest_path", ""):
+                paths.append(event.dest_path)
+            batcher.add(paths)
+
+    observer = Observer()
+    observer.daemon = True
+    observer.schedule(GalleryEventHandler(), index.root, recursive=True)
+    observer.start()
+    return observer
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_gallery_index():
+    """进程内共享的图库索引：首次调用时在后台做一次增量扫描并开始监听目录"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = GalleryIndex(dedup=get_dedup_index())
+            if os.path.isdir(_default_index.root):
+                start_watching(_default_index)
+                threading.Thread(target=_default_index.scan, name="gallery-scan", daemon=True).start()
+        return _default_index
+
+
+@profiled("图库缩略图")
+def render_gallery_grid(key_prefix, columns=4, page_size=PAGE_SIZE):
+    """分页的缩略图网格：每次只读取、只发送当前页；翻页只重跑这一块"""
+    index = get_gallery_index()
+
+    def gallery_grid():
+        starts = index.page_starts(page_size)
+        if not starts:
+            if index.indexing:
+                st.info("正在建立图库索引…")
+            else:
+                st.caption(f"把照片放进 {index.root} 即可在这里分页浏览")
+            return
+
+        pages = len(starts)
+        page_no = st.number_input(f"页码（共 {pages} 页，{index.count()} 张）", 1, pages, 1, key=f"{key_prefix}gallery_page") - 1
+        rows = index.page(starts[min(page_no, pages - 1)], page_size)
+        for start in range(0, len(rows), columns):
+            for col, row in zip(st.columns(columns), rows[start:start + columns]):
+                with col:
+                    try:
+                        st.image(index.thumbnail(row), caption=row["caption"], use_container_width=True)
+                    except Exception:
+                        st.caption(f"无法读取：{row['caption']}")
+        if page_no + 1 < pages:
+            index.warm_page(starts[page_no + 1], page_size)
+
+    st.fragment(gallery_grid)()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="增量扫描宠物图库目录，建立SQLite索引")
+    parser.add_argument("command", choices=["scan"])
+    parser.add_argument("root", nargs="?", default=GALLERY_DIR, help="图库目录")
+    args = parser.parse_args(argv)
+
+    index = GalleryIndex(args.root)
+    updated, removed = index.scan()
+    print(f"索引：{index.db_path}")
+    print(f"共 {index.count()} 张，本次更新 {updated} 张，删除 {removed} 张")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image, features
+from requests.adapters import HTTPAdapter
+import streamlit as st
+
+from app_cache import get_cache_dir
+from profiling import profiled
+
+# 生成的缩略图宽度（像素），按展示宽度取不小于它的最小一档
+VARIANT_WIDTHS = (480, 800, 1280)
+# st.image 只原样发送JPEG/PNG，其他格式会被重新编码为JPEG，所以页面用的缩略图默认存JPEG；
+# 直接对外提供文件时可改用WebP（Pillow未编译WebP支持时仍退回JPEG）
+VARIANT_EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp"}
+VARIANT_QUALITY = 80
+
+
+def pick_width(width):
+    """展示宽度对应的缩略图档位"""
+    for candidate in VARIANT_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return VARIANT_WIDTHS[-1]
+
+
+def write_variant(src_path, dst_path, width, image_format="JPEG"):
+    """把图片缩放到指定宽度（不放大）后写入 dst_path，返回 dst_path"""
+    with Image.open(src_path) as img:
+        # JPEG可在解码阶段按比例缩小，大图不必完整解码
+        img.draft("RGB", (width, width * 4))
+        img.thumbnail((width, width * 4))
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        mode = "RGBA" if has_alpha and image_format == "WEBP" else "RGB"
+        if img.mode != mode:
+            img = img.convert(mode)
+        tmp_path = f"{dst_path}.{threading.get_ident()}.tmp"
+        img.save(tmp_path, format=image_format, quality=VARIANT_QUALITY)
+    os.replace(tmp_path, dst_path)
+    return dst_path
+
+
+class ImageCache:
+    """图片代理缓存：原图只从源站下载一次存到磁盘，再按展示宽度生成缩小的JPEG/WebP
+
+    下载在后台线程进行，页面只读取已经缓存好的文件，从不等待网络；
+    原图还没下载好（或源站不可用）时返回None，由调用方退回使用原链接。
+    """
+
+    def __init__(self, cache_dir=None, image_format="JPEG", timeout=10, negative_ttl=60, max_workers=4, session=None):
+        self.cache_dir = cache_dir or get_cache_dir("images")
+        self.image_format = "WEBP" if image_format == "WEBP" and features.check("webp") else "JPEG"
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl  # 下载失败后多久再重试（秒）
+        os.makedirs(os.path.join(self.cache_dir, "originals"), exist_ok=True)
+        os.makedirs(os.path.join(self.cache_dir, "variants"), exist_ok=True)
+        self._session = session or self._build_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-cache")
+        self._lock = threading.Lock()
+        self._pending = {}  # url -> Future
+        self._failures = {}  # url -> 失败时间
+        self._warming = set()  # 正在后台生成的 (url, 宽度)
+
+    @staticmethod
+    def _build_session(pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def original_path(self, url):
+        return os.path.join(self.cache_dir, "originals", self._key(url))
+
+    def variant_path(self, url, width):
+        ext = VARIANT_EXTENSIONS[self.image_format]
+        return os.path.join(self.cache_dir, "variants", f"{self._key(url)}_{width}.{ext}")
+
+    def _download(self, url):
+        try:
+            response = self._session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.content
+            # 确认下载到的是能解码的图片，再写入缓存
+            Image.open(io.BytesIO(data)).verify()
+            path = self.original_path(url)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            return True
+        except Exception:
+            with self._lock:
+                self._failures[url] = time.monotonic()
+            return False
+        finally:
+            with self._lock:
+                self._pending.pop(url, None)
+
+    def fetch(self, url):
+        """在后台下载原图（同一链接同时只下载一次），返回Future；已缓存或近期失败过时返回None"""
+        if os.path.exists(self.original_path(url)):
+            return None
+        with self._lock:
+            failed_at = self._failures.get(url)
+            if failed_at is not None and time.monotonic() - failed_at < self.negative_ttl:
+                return None
+            if url not in self._pending:
+                self._pending[url] = self._executor.submit(self._download, url)
+            return self._pending[url]
+
+    def _make_variant(self, url, width):
+        return write_variant(self.original_path(url), self.variant_path(url, width), width, self.image_format)
+
+    def get(self, url, width):
+        """返回指定宽度档位的缩略图文件路径；原图尚未缓存时在后台开始下载并返回None"""
+        width = pick_width(width)
+        path = self.variant_path(url, width)
+        if os.path.exists(path):
+            return path
+        if not os.path.exists(self.original_path(url)):
+            self.fetch(url)
+            return None
+        try:
+            return self._make_variant(url, width)
+        except Exception:
+            return None
+
+    def _warm_variant(self, url, width):
+        try:
+            self._make_variant(url, width)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._warming.discard((url, width))
+
+    def prefetch(self, url, width):
+        """提前准备好指定宽度的缩略图（全部在后台进行，立即返回）：原图未缓存则下载，缩略图未生成则生成"""
+        if not os.path.exists(self.original_path(url)):
+            future = self.fetch(url)
+            if future is not None:
+                future.add_done_callback(lambda f: f.result() and self.prefetch(url, width))
+            return
+        width = pick_width(width)
+        if os.path.exists(self.variant_path(url, width)):
+            return
+        with self._lock:
+            if (url, width) in self._warming:
+                return
+            self._warming.add((url, width))
+        self._executor.submit(self._warm_variant, url, width)
+
+    def wait(self, url, timeout=None):
+        """阻塞等待原图下载完成（供脚本和测试使用，页面渲染不要调用），返回是否已缓存"""
+        future = self.fetch(url)
+        if future is not None:
+            future.result(timeout=timeout)
+        return os.path.exists(self.original_path(url))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_image_cache():
+    """进程内共享的图片缓存，所有会话共用同一份磁盘文件和下载线程池"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ImageCache()
+        return _default_cache
+
+
+@profiled("图片缓存")
+def cached_image(url, width=800):
+    """st.image 可直接使用的图片来源：已缓存时为本地缩略图路径，否则先用原链接（同时在后台缓存）"""
+    return get_image_cache().get(url, width) or url
+
+
+PRELOAD_KEY_PREFIX = "image_preload_"  # 预加载容器的键前缀，themes/photo.css 按这个前缀隐藏容器
+
+
+def neighbor_indices(index, count):
+    """相册中当前图片前后各一张的下标（循环翻页）"""
+    return sorted({(index - 1) % count, (index + 1) % count} - {index})
+
+
+@profiled("预取相邻图片")
+def preload_neighbors(urls, index, width, key):
+    """翻页前预热：服务端在后台准备前后两张的缩略图，浏览器端用隐藏的图片元素提前下载
+
+    已缓存的图片与正式显示时内容相同、媒体地址相同，翻页时浏览器直接命中缓存；
+    未缓存的先让浏览器从原链接预加载。
+    """
+    cache = get_image_cache()
+    neighbors = [urls[i] for i in neighbor_indices(index, len(urls))]
+    for url in neighbors:
+        cache.prefetch(url, width)
+
+    with st.container(key=f"{PRELOAD_KEY_PREFIX}{key}"):
+        for url in neighbors:
+            # 只用已经生成好的缩略图，生成工作留给后台
+            path = cache.variant_path(url, pick_width(width))
+            st.image(path if os.path.exists(path) else url, use_column_width=True)
@@ -0,0 +1,136 @@
+"""按需导入：模块在第一次用到其中的名字时才真正导入
+
+top.py 的各分区依赖 pandas、pyarrow、pydeck、reportlab、PIL、tornado 等重量级库，
+改为按需导入后，首页第一次渲染只需导入 Streamlit 本身；切到某个分区时才导入该分区用到的模块。
+
+    food_data = lazy_import("food_data")   # 这里不导入
+    food_data.load_food_data()             # 第一次访问属性时才导入（地址加 ?profile=1 时计入耗时表）
+
+命令行：统计页面脚本各依赖的导入耗时（基于 python -X importtime，按顶层包汇总）
+    python lazy_imports.py report top.py
+"""
+import argparse
+import ast
+import importlib
+import os
+import subprocess
+import sys
+import threading
+
+from profiling import span
+
+_lock = threading.Lock()
+_proxies = {}
+
+
+class LazyModule:
+    """模块的替身：第一次访问属性时导入真正的模块，之后直接转发"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            # import_module 本身是线程安全的，多个会话同时首次访问时只会真正导入一次
+            with span(f"导入 {self._name}"):
+                module = importlib.import_module(self._name)
+            self._module = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "已导入" if self._module is not None else "未导入"
+        return f"<LazyModule {self._name}（{state}）>"
+
+
+def lazy_import(name):
+    """返回模块的按需导入替身（同名模块共用一个替身）"""
+    with _lock:
+        if name not in _proxies:
+            _proxies[name] = LazyModule(name)
+        return _proxies[name]
+
+
+# --------------------------
+# 导入耗时报告
+# --------------------------
+def script_imports(path):
+    """找出脚本顶层直接导入的模块和通过 lazy_import 按需导入的模块"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    eager, lazy = [], []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            eager.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            eager.append(node.module)
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and getattr(node.func, "id", None) == "lazy_import"
+                and node.args and isinstance(node.args[0], ast.Constant)):
+            lazy.append(node.args[0].value)
+    eager = list(dict.fromkeys(eager))
+    return eager, [name for name in dict.fromkeys(lazy) if name not in eager]
+
+
+def parse_importtime(output):
+    """解析 -X importtime 的输出，返回 [(层级, 模块名, 自身耗时us, 累计耗时us)]"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        level = (len(name) - len(name.lstrip())) // 2
+        entries.append((level, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure_imports(modules, cwd):
+    """在新进程中按顺序导入各模块，返回 {直接导入的模块: 累计耗时us} 和 {顶层包: 自身耗时us}"""
+    code = "\n".join(f"import {name}" for name in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=cwd)
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    direct, packages = {}, {}
+    for level, name, self_us, cumulative_us in parse_importtime(result.stderr):
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + self_us
+        if level == 0 and name in modules:
+            direct[name] = cumulative_us
+    return direct, packages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="统计页面脚本各依赖的导入耗时（python -X importtime 按顶层包汇总）")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("script", help="页面脚本，如 top.py")
+    parser.add_argument("--top", type=int, default=15, help="显示耗时最多的前N个包")
+    args = parser.parse_args(argv)
+
+    script = os.path.abspath(args.script)
+    eager, lazy = script_imports(script)
+    # streamlit 最先导入，它自身的依赖不算到页面模块头上
+    modules = ["streamlit"] + [name for name in eager if name != "streamlit"] + lazy
+    direct, packages = measure_imports(modules, os.path.dirname(script))
+
+    print(f"{os.path.basename(script)} 的直接导入（按导入顺序，累计耗时只含此前未导入过的部分）")
+    for name in modules:
+        kind = "按需" if name in lazy else "启动"
+        print(f"  {kind}  {name:24s} {direct.get(name, 0) / 1000:8.1f} ms")
+    startup = sum(direct.get(name, 0) for name in modules if name not in lazy)
+    deferred = sum(direct.get(name, 0) for name in lazy)
+    print(f"启动时导入合计 {startup / 1000:.1f} ms，推迟到首次使用 {deferred / 1000:.1f} ms")
+
+    print(f"\n各依赖包的导入耗时（自身耗时之和，前 {args.top} 个）")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:24s} {self_us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import streamlit as st
+from profiling import render_profile_panel, section, start_profiling
+from theme import apply_theme  # 样式在 themes/ 目录，每个进程只编译一次
 
 # ---------------------- 全局页面配置 ----------------------
 st.set_page_config(
@@ -7,36 +9,19 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+start_profiling("main")  # 地址加 ?profile=1 时在侧边栏显示各段落耗时
 
 # ---------------------- 全局样式（侧边栏样式保留） ----------------------
-st.markdown("""
-    <style>
-    .main {
-        background-color: #f8f9fa;
-        padding: 20px;
-    }
-    h1, h2, h3 {
-        color: #e67e22;
-    }
-    p {
-        font-size: 16px;
-        line-height: 1.6;
-        color: #34495e;
-    }
-    .sidebar .sidebar-content {
-        background-color: #34495e;
-        color: white;
-    }
-    .sidebar .sidebar-content a {
-        color: white !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
+section("页面样式")
+apply_theme("main")
 
 # 主页面欢迎语（中文）
+section("欢迎页")
 st.title("🐾 宠物家园介绍系统")
 st.write("请从左侧侧边栏选择需要查看的宠物家园相关页面")
 
 # （可选）如果是自定义侧边栏，添加中文组件
 st.sidebar.title("🐾 导航菜单")  # 侧边栏中文标题
-st.sidebar.write("👇 选择你想查看的内容")  # 侧边栏中文提示
\ No newline at end of file
+st.sidebar.write("👇 选择你想查看的内容")  # 侧边栏中文提示
+
+render_profile_panel()
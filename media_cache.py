@@ -0,0 +1,126 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app_cache import get_cache_dir
+
+MEDIA_PORT = int(os.environ.get("PET_HOME_MEDIA_PORT", "0") or 0)  # 本地音视频服务端口，0 表示不开启
+MAX_MEDIA_BYTES = 1024 * 1024 * 1024  # 单个音视频文件的缓存上限
+MEDIA_EXTENSIONS = {".mp4", ".webm", ".m4v", ".mov", ".mp3", ".m4a", ".aac", ".ogg", ".wav", ".flac"}
+
+
+class MediaCache:
+    """音视频本地缓存：源站文件在后台完整下载一次存到磁盘，之后由本地服务提供播放和拖动
+
+    和图片缓存一样，页面只查询是否已缓存，从不等待下载；未缓存时调用方继续使用源站链接。
+    """
+
+    def __init__(self, cache_dir=None, timeout=30, negative_ttl=600, max_workers=2, session=None):
+        self.cache_dir = cache_dir or get_cache_dir(os.path.join("media", "files"))
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl  # 下载失败后多久再重试（秒）
+        self._session = session or self._build_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="media-cache")
+        self._lock = threading.Lock()
+        self._pending = {}  # url -> Future
+        self._failures = {}  # url -> 失败时间
+
+    @staticmethod
+    def _build_session(pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def file_name(url):
+        """缓存文件名：链接的SHA-1 + 原扩展名（本地服务据此判断 Content-Type）"""
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        if ext not in MEDIA_EXTENSIONS:
+            ext = ".bin"
+        return hashlib.sha1(url.encode("utf-8")).hexdigest() + ext
+
+    def path_for(self, url):
+        return os.path.join(self.cache_dir, self.file_name(url))
+
+    def _download(self, url):
+        path = self.path_for(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with self._session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                written = 0
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(1024 * 1024):
+                        written += len(chunk)
+                        if written > MAX_MEDIA_BYTES:
+                            raise ValueError("文件超过缓存上限")
+                        f.write(chunk)
+            os.replace(tmp_path, path)
+            return True
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with self._lock:
+                self._failures[url] = time.monotonic()
+            return False
+        finally:
+            with self._lock:
+                self._pending.pop(url, None)
+
+    def fetch(self, url):
+        """在后台下载（同一链接同时只下载一次），返回Future；已缓存或近期失败过时返回None"""
+        if os.path.exists(self.path_for(url)):
+            return None
+        with self._lock:
+            failed_at = self._failures.get(url)
+            if failed_at is not None and time.monotonic() - failed_at < self.negative_ttl:
+                return None
+            if url not in self._pending:
+                self._pending[url] = self._executor.submit(self._download, url)
+            return self._pending[url]
+
+    def get(self, url):
+        """已缓存时返回本地文件路径；否则在后台开始下载并返回None"""
+        path = self.path_for(url)
+        if os.path.exists(path):
+            return path
+        self.fetch(url)
+        return None
+
+    def is_pending(self, url):
+        with self._lock:
+            return url in self._pending
+
+    def wait(self, url, timeout=None):
+        """阻塞等待下载完成（供脚本和测试使用，页面渲染不要调用），返回本地路径或None"""
+        future = self.fetch(url)
+        if future is not None:
+            future.result(timeout=timeout)
+        path = self.path_for(url)
+        return path if os.path.exists(path) else None
+
+
+def media_cache_enabled():
+    """只有开启了本地音视频服务（PET_HOME_MEDIA_PORT）时才把音视频下载到本地"""
+    return bool(MEDIA_PORT)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_media_cache():
+    """进程内共享的音视频缓存"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = MediaCache()
+        return _default_cache
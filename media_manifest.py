@@ -0,0 +1,275 @@
+"""视频片源清单：每个链接用 HTTP Range 请求探测一次（只读文件头和 moov 元数据，不下载整个视频），
+得到大小、时长、编码、分辨率、是否支持拖动，结果带 TTL 缓存并保存到磁盘，页面只读取、从不等待网络。
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from app_cache import get_cache_dir
+
+HEAD_BYTES = 64 * 1024  # 第一次请求读取的字节数，faststart 的 MP4 元数据通常都在这里
+MAX_MOOV_BYTES = 8 * 1024 * 1024  # moov 超过这个大小就不再下载，只报告大小和可用性
+MAX_TOP_LEVEL_BOXES = 16
+
+CODEC_NAMES = {
+    "avc1": "H.264", "avc3": "H.264", "hvc1": "H.265", "hev1": "H.265",
+    "av01": "AV1", "vp09": "VP9", "mp4a": "AAC", "opus": "Opus", "ac-3": "AC-3"
+}
+
+
+def iter_boxes(data, start=0, end=None):
+    """遍历 MP4 box，产出 (类型, 内容起点, box终点)"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size = int.from_bytes(data[offset:offset + 4], "big")
+        box_type = data[offset + 4:offset + 8].decode("latin-1")
+        header = 8
+        if size == 1:
+            size = int.from_bytes(data[offset + 8:offset + 16], "big")
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+
+def find_box(data, path, start=0, end=None):
+    """按路径（如 ["mdia", "hdlr"]）查找第一个子box，返回 (内容起点, 终点) 或 None"""
+    for box_type, payload, box_end in iter_boxes(data, start, end):
+        if box_type == path[0]:
+            return (payload, box_end) if len(path) == 1 else find_box(data, path[1:], payload, box_end)
+    return None
+
+
+def parse_moov(moov):
+    """从 moov box 的完整字节中解析时长、编码和分辨率"""
+    info = {"duration": None, "video_codec": None, "audio_codec": None, "width": None, "height": None}
+    mvhd = find_box(moov, ["moov", "mvhd"])
+    if mvhd is not None:
+        payload = mvhd[0]
+        if moov[payload] == 1:
+            timescale = int.from_bytes(moov[payload + 20:payload + 24], "big")
+            duration = int.from_bytes(moov[payload + 24:payload + 32], "big")
+        else:
+            timescale = int.from_bytes(moov[payload + 12:payload + 16], "big")
+            duration = int.from_bytes(moov[payload + 16:payload + 20], "big")
+        if timescale:
+            info["duration"] = round(duration / timescale, 2)
+
+    moov_box = find_box(moov, ["moov"])
+    if moov_box is None:
+        return info
+    for box_type, payload, box_end in iter_boxes(moov, *moov_box):
+        if box_type != "trak":
+            continue
+        hdlr = find_box(moov, ["mdia", "hdlr"], payload, box_end)
+        stsd = find_box(moov, ["mdia", "minf", "stbl", "stsd"], payload, box_end)
+        if hdlr is None or stsd is None:
+            continue
+        handler = moov[hdlr[0] + 8:hdlr[0] + 12].decode("latin-1")
+        # stsd：version/flags(4) + 条目数(4)，之后是第一个采样描述 box
+        entry = stsd[0] + 8
+        codec = moov[entry + 4:entry + 8].decode("latin-1")
+        if handler == "vide" and info["video_codec"] is None:
+            info["video_codec"] = codec
+            # 视频采样描述：box头(8) + 保留/索引(8) + 预定义等(16) 之后是宽、高各2字节
+            info["width"] = int.from_bytes(moov[entry + 32:entry + 34], "big")
+            info["height"] = int.from_bytes(moov[entry + 34:entry + 36], "big")
+        elif handler == "soun" and info["audio_codec"] is None:
+            info["audio_codec"] = codec
+    return info
+
+
+class MediaManifest:
+    """片源清单：后台探测、TTL 缓存、结果写入磁盘；页面只读取上一次的结果"""
+
+    def __init__(self, path=None, ttl=24 * 3600, negative_ttl=600, timeout=10, max_workers=4, session=None):
+        self.path = path or os.path.join(get_cache_dir("media"), "manifest.json")
+        self.ttl = ttl  # 可用片源的元数据缓存时间（秒）
+        self.negative_ttl = negative_ttl  # 不可用片源多久后重新探测（秒）
+        self.timeout = timeout
+        self._session = session or self._build_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="media-probe")
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._entries = self._load()
+
+    @staticmethod
+    def _build_session(pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def _fetch_range(self, url, start, end):
+        """读取 [start, end] 字节，返回 (数据, 文件总大小, 是否支持Range)"""
+        with self._session.get(
+            url, headers={"Range": f"bytes={start}-{end}"}, timeout=self.timeout, stream=True
+        ) as response:
+            if response.status_code == 206:
+                total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                return response.content, int(total) if total.isdigit() else None, True
+            response.raise_for_status()
+            # 服务器忽略了Range，整个文件都会传过来：只读需要的部分就断开
+            if start != 0:
+                return b"", None, False
+            length = response.headers.get("Content-Length")
+            data = b""
+            for chunk in response.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > end:
+                    break
+            return data[:end + 1], int(length) if length and length.isdigit() else None, False
+
+    def probe(self, url):
+        """同步探测一个片源，返回元数据字典"""
+        meta = {"url": url, "available": False, "probed_at": time.time()}
+        try:
+            head, size, ranges = self._fetch_range(url, 0, HEAD_BYTES - 1)
+            meta.update(available=True, size=size, accepts_ranges=ranges)
+            # 依次跳过顶层 box（ftyp、mdat……）直到找到 moov
+            offset, moov = 0, None
+            for _ in range(MAX_TOP_LEVEL_BOXES):
+                if offset + 16 <= len(head):
+                    header = head[offset:offset + 16]
+                elif ranges and (size is None or offset < size):
+                    header = self._fetch_range(url, offset, offset + 15)[0]
+                else:
+                    break
+                if len(header) < 8:
+                    break
+                box_size = int.from_bytes(header[:4], "big")
+                if box_size == 1:
+                    box_size = int.from_bytes(header[8:16], "big")
+                elif box_size == 0 and size is not None:
+                    box_size = size - offset
+                box_type = header[4:8].decode("latin-1")
+                if box_size < 8:
+                    break
+                if box_type == "moov":
+                    if box_size > MAX_MOOV_BYTES:
+                        break
+                    if offset + box_size <= len(head):
+                        moov = head[offset:offset + box_size]
+                    elif ranges:
+                        moov = self._fetch_range(url, offset, offset + box_size - 1)[0]
+                    break
+                offset += box_size
+            if moov is not None:
+                meta.update(parse_moov(moov))
+        except Exception as e:
+            meta["error"] = str(e)
+        return meta
+
+    def _run_probe(self, url):
+        meta = self.probe(url)
+        with self._lock:
+            self._entries[url] = meta
+            self._pending.discard(url)
+            try:
+                self._save()
+            except OSError:
+                pass
+        return meta
+
+    def get(self, url):
+        """返回已缓存的元数据（可能已过期）；没有或已过期时在后台重新探测。从未探测过返回None"""
+        with self._lock:
+            meta = self._entries.get(url)
+            fresh = meta is not None and time.time() - meta["probed_at"] < (
+                self.ttl if meta["available"] else self.negative_ttl
+            )
+            if not fresh and url not in self._pending:
+                self._pending.add(url)
+                self._executor.submit(self._run_probe, url)
+            return meta
+
+    def is_pending(self, url):
+        with self._lock:
+            return url in self._pending
+
+    def wait(self, url, timeout=None):
+        """阻塞等待探测结果（供脚本和测试使用，页面渲染不要调用）"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.get(url)
+        while self.is_pending(url):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.01)
+        with self._lock:
+            return self._entries.get(url)
+
+
+_default_manifest = None
+_default_manifest_lock = threading.Lock()
+
+
+def get_media_manifest():
+    """进程内共享的片源清单"""
+    global _default_manifest
+    with _default_manifest_lock:
+        if _default_manifest is None:
+            _default_manifest = MediaManifest()
+        return _default_manifest
+
+
+def _format_size(size):
+    return f"{size / 1024 / 1024:.1f} MB" if size >= 1024 * 1024 else f"{size / 1024:.0f} KB"
+
+
+def describe_media(url):
+    """片源状态的一行说明（不等待网络）"""
+    meta = get_media_manifest().get(url)
+    if meta is None:
+        return "⏳ 正在检测片源…"
+    if not meta["available"]:
+        return "⚠️ 片源暂时无法访问"
+    parts = ["✅ 可播放"]
+    if meta.get("duration"):
+        minutes, seconds = divmod(int(meta["duration"]), 60)
+        parts.append(f"{minutes}:{seconds:02d}")
+    if meta.get("size"):
+        parts.append(_format_size(meta["size"]))
+    if meta.get("video_codec"):
+        parts.append(CODEC_NAMES.get(meta["video_codec"], meta["video_codec"]))
+    if meta.get("height"):
+        parts.append(f"{meta['height']}p")
+    if not meta.get("accepts_ranges"):
+        parts.append("不支持拖动进度")
+    return " · ".join(parts)
+
+
+def refresh_when_probed(urls, poll_interval=1.0):
+    """还有片源在检测时，在局部片段里轮询；全部检测完后整页刷新一次，显示最新状态"""
+    manifest = get_media_manifest()
+    if not any(manifest.is_pending(url) for url in urls):
+        return
+
+    def manifest_watcher():
+        if not any(manifest.is_pending(url) for url in urls):
+            st.rerun()
+
+    st.fragment(manifest_watcher, run_every=poll_interval)()
@@ -0,0 +1,214 @@
+"""本地音视频服务：在 Streamlit 进程里另开一个 Tornado 端口，直接提供缓存好的音视频文件
+
+支持 HTTP Range（206 部分内容，播放器拖动进度只请求需要的片段）、ETag/304，
+Linux/macOS 上用 os.sendfile 零拷贝发送文件内容，发完后连接交还给 HTTP 服务，保持长连接。
+
+默认关闭；设置环境变量 PET_HOME_MEDIA_PORT（如 8765）后开启。默认只监听 127.0.0.1（本机浏览器或
+同机的反向代理可以访问）；要让其他机器直接访问，设置 PET_HOME_MEDIA_HOST=0.0.0.0。
+部署在反向代理后面时，用 PET_HOME_MEDIA_BASE_URL 指定浏览器访问的地址前缀。
+"""
+import asyncio
+import mimetypes
+import os
+import re
+import threading
+
+import streamlit as st
+import tornado.httpserver
+import tornado.iostream
+import tornado.netutil
+import tornado.web
+
+from media_cache import MEDIA_PORT, get_media_cache
+
+MEDIA_HOST = os.environ.get("PET_HOME_MEDIA_HOST", "127.0.0.1")
+MEDIA_BASE_URL = os.environ.get("PET_HOME_MEDIA_BASE_URL", "")
+CHUNK_SIZE = 256 * 1024
+FILE_NAME_PATTERN = re.compile(r"^[0-9a-f]{40}\.[0-9a-z]{2,5}$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """解析单段 Range 头，返回 (起点, 终点) 闭区间；无 Range 返回 None；无法满足时抛出 ValueError"""
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None  # 多段或格式不认识：按整个文件返回
+    start, end = match.groups()
+    if start == "":
+        if end == "" or int(end) == 0:
+            raise ValueError(header)
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class MediaFileHandler(tornado.web.RequestHandler):
+    """GET/HEAD /media/<文件名>：Range、ETag、零拷贝发送"""
+
+    def initialize(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _resolve(self, file_name):
+        if not FILE_NAME_PATTERN.match(file_name):
+            raise tornado.web.HTTPError(404)
+        path = os.path.join(self.cache_dir, file_name)
+        if not os.path.isfile(path):
+            raise tornado.web.HTTPError(404)
+        return path
+
+    def head(self, file_name):
+        return self.get(file_name, include_body=False)
+
+    async def get(self, file_name, include_body=True):
+        path = self._resolve(file_name)
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+
+        self.set_header("Accept-Ranges", "bytes")
+        self.set_header("ETag", etag)
+        self.set_header("Cache-Control", "public, max-age=86400")
+        self.set_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+
+        if etag in self.request.headers.get("If-None-Match", ""):
+            self.set_status(304)
+            return
+
+        range_header = self.request.headers.get("Range")
+        if_range = self.request.headers.get("If-Range")
+        if if_range and if_range != etag:
+            range_header = None  # 文件已变化，返回整个文件
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            self.set_status(416)
+            self.set_header("Content-Range", f"bytes */{size}")
+            return
+
+        start, end = byte_range or (0, size - 1)
+        if byte_range is not None:
+            self.set_status(206)
+            self.set_header("Content-Range", f"bytes {start}-{end}/{size}")
+        length = end - start + 1
+        self.set_header("Content-Length", str(length))
+        if not include_body or length <= 0:
+            return
+
+        if hasattr(os, "sendfile") and self.request.protocol == "http":
+            await self._sendfile(path, start, length)
+        else:
+            await self._send_chunks(path, start, length)
+
+    async def _send_chunks(self, path, start, length):
+        with open(path, "rb") as f:
+            f.seek(start)
+            while length > 0:
+                chunk = f.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                self.write(chunk)
+                try:
+                    await self.flush()
+                except tornado.iostream.StreamClosedError:
+                    return
+
+    def _keep_alive(self):
+        """客户端是否要求保持连接（与 Tornado 自己的判断规则相同）"""
+        connection = self.request.headers.get("Connection", "").lower()
+        if self.request.version == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+    async def _sendfile(self, path, start, length):
+        """先经 Tornado 发出响应头，再接管连接，用 os.sendfile 从页缓存直接写入 socket
+
+        由事件循环的 sock_sendfile 发送（socket 保持非阻塞，不占用线程）；发送完毕后把连接交还给
+        HTTP 服务（handle_stream），同一连接上的后续请求照常处理。
+        """
+        server = self.settings.get("http_server")
+        keep_alive = server is not None and self._keep_alive()
+        address = self.request.connection.context.address
+        self.request.connection.set_close_callback(None)
+        await self.flush()
+        stream = self.detach()
+        try:
+            with open(path, "rb") as f:
+                sent = await asyncio.get_running_loop().sock_sendfile(stream.socket, f, start, length)
+        except OSError:
+            sent = 0  # 播放器拖动进度时常常主动断开上一个请求
+        if sent == length and keep_alive and not stream.closed():
+            server.handle_stream(stream, address)
+        else:
+            stream.close()
+
+
+def make_app(cache_dir):
+    return tornado.web.Application([
+        (r"/media/([^/]+)", MediaFileHandler, {"cache_dir": cache_dir})
+    ])
+
+
+def run_media_server(cache_dir, port, host=MEDIA_HOST):
+    """在新的后台线程里运行服务，返回实际监听的端口（port 为 0 时由系统分配）；端口被占用时返回None"""
+    started = threading.Event()
+    result = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            app = make_app(cache_dir)
+            server = tornado.httpserver.HTTPServer(app)
+            app.settings["http_server"] = server  # sendfile 发完后把连接交还给它
+            sockets = tornado.netutil.bind_sockets(port, address=host)
+            server.add_sockets(sockets)
+            result["port"] = sockets[0].getsockname()[1]
+        except OSError:
+            return
+        finally:
+            started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, name="media-server", daemon=True).start()
+    started.wait(5)
+    return result.get("port")
+
+
+_server_port = None
+_server_lock = threading.Lock()
+
+
+def start_media_server(port=MEDIA_PORT):
+    """在后台线程里启动本地音视频服务（每个进程只启动一次），返回端口；未开启或端口被占用时返回None"""
+    global _server_port
+    if not port:
+        return None
+    with _server_lock:
+        if _server_port is None:
+            _server_port = run_media_server(get_media_cache().cache_dir, port)
+        return _server_port
+
+
+def _base_url(port):
+    if MEDIA_BASE_URL:
+        return MEDIA_BASE_URL.rstrip("/")
+    # 浏览器访问 Streamlit 用的主机名，换成本地服务的端口
+    host = st.context.headers.get("Host", "localhost").rsplit(":", 1)[0]
+    return f"http://{host}:{port}"
+
+
+def media_url(url):
+    """st.video / st.audio 使用的地址：已缓存且本地服务已开启时用本地地址，否则用源站链接（同时在后台缓存）"""
+    port = start_media_server()
+    if port is None:
+        return url
+    if get_media_cache().get(url) is None:
+        return url
+    return f"{_base_url(port)}/media/{get_media_cache().file_name(url)}"
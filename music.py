@@ -1,5 +1,9 @@
 import streamlit as st
-import random
+from profiling import render_profile_panel, section, start_profiling
+from media_server import media_url  # 已缓存到本地时由本地服务播放（支持拖动进度）
+from music_library import ShuffleOrder, format_duration, load_music_library
+from theme import apply_theme  # 样式在 themes/ 目录，每个进程只编译一次
+from site_content import content_version, get_content  # 剧集、歌曲、图片等静态内容在 data/site_content.json，所有会话共享一份
 
 # 1. 设置页面标题和图标
 st.set_page_config(
@@ -7,88 +11,21 @@ st.set_page_config(
     page_icon="🎵",
     layout="centered"
 )
+start_profiling("music")  # 地址加 ?profile=1 时在侧边栏显示各段落耗时
 
 # 2. 自定义CSS（莫兰迪灰粉色背景、样式优化）
-st.markdown("""
-    <style>
-    /* 页面整体背景 */
-    .stApp {
-        background-color: #f0e8e6;  /* 莫兰迪灰粉色 */
-    }
-    
-    /* 标题样式 */
-    h1 {
-        color: #8b7369;  /* 莫兰迪深棕色 */
-        text-align: center;
-    }
-    
-    /* 子标题样式 */
-    h2 {
-        color: #9d887e;
-    }
-    
-    /* 文本样式 */
-    p, div, span {
-        color: #7a6b61;
-    }
-    
-    /* 按钮样式 */
-    .stButton > button {
-        background-color: #e0d2cd;
-        color: #6d5c53;
-        border: none;
-        border-radius: 8px;
-        padding: 8px 16px;
-        font-size: 16px;
-        transition: all 0.3s ease;
-    }
-    
-    /* 按钮hover效果 */
-    .stButton > button:hover {
-        background-color: #d1c4be;
-        color: #5c4b43;
-    }
-    
-    /* 滑块样式 */
-    .stSlider > div > div > div {
-        background-color: #d1c4be;
-    }
-    
-    /* 滑块进度条 */
-    .stSlider > div > div > div > div {
-        background-color: #b9a79e;
-    }
-    </style>
-""", unsafe_allow_html=True)
+section("页面样式")
+apply_theme("music")
 
 # 3. 页面标题与描述
 st.title("🎵 汪苏泷 专属音乐播放器")
 st.caption("使用Streamlit制作的简单音乐播放器 | 莫兰迪灰粉色主题 | 支持切歌和基本播放控制")
 
-# 4. 定义汪苏泷的歌曲列表（包含封面、歌曲名、歌手、时长、播放链接）
-music_list = [
-    {
-        "cover_url": "https://puui.qpic.cn/media_img/0/1087111581842036/0",
-        "title": "年轮",
-        "artist": "汪苏泷",
-        "duration": "4:18",
-        "audio_url": "https://music.163.com/song/media/outer/url?id=36966611.mp3"  # 示例链接
-    },
-    {
-        "cover_url": "https://pic1.zhimg.com/50/v2-cc08e82965b5478be4dbb354733ddd84_hd.jpg?source=1940ef5c",
-        "title": "不分手的恋爱",
-        "artist": "汪苏泷",
-        "duration": "3:50",
-        "audio_url": "https://music.163.com/song/media/outer/url?id=506471182.mp3"  # 示例链接
-    },
-    {
-        "cover_url": "https://www.360baike.com/uploads/202304/1681529925M6LOPzh4.jpg",
-        "title": "大娱乐家",
-        "artist": "汪苏泷",
-        "duration": "3:25",
-        "audio_url": "https://music.163.com/song/media/outer/url?id=1877241709.mp3"  # 示例链接
-    }
-]
+# 4. 定义汪苏泷的歌曲列表（包含封面、歌曲名、歌手、时长、播放链接）；有曲库文件时以曲库文件为准
+section("加载曲库")
+music_list = get_content("music")
+
+library = load_music_library(music_list, default_version=content_version())
 
 # 5. 初始化session_state
 if "current_music_idx" not in st.session_state:
@@ -97,94 +34,117 @@ if "is_playing" not in st.session_state:
     st.session_state.is_playing = False  # 播放状态
 if "progress" not in st.session_state:
     st.session_state.progress = 0  # 播放进度
-
-# 6. 获取当前播放的音乐信息
-current_music = music_list[st.session_state.current_music_idx]
-
-# 7. 布局：左侧封面，右侧信息
-col_cover, col_info = st.columns([1, 2])
-
-with col_cover:
-    # 显示专辑封面（圆角样式）
-    st.markdown(f"""
-        <div style="border-radius: 12px; overflow: hidden; box-shadow: 0 4px 12px rgba(0,0,0,0.1);">
-            <img src="{current_music['cover_url']}" width="100%" style="display: block;">
-        </div>
-        <p style="text-align: center; margin-top: 8px; color: #8b7369;">专辑封面</p>
-    """, unsafe_allow_html=True)
-
-with col_info:
-    # 显示歌曲信息
-    st.subheader(f"{current_music['title']}")
-    st.write(f"🎤 歌手: {current_music['artist']}")
-    st.write(f"⏱️ 时长: {current_music['duration']}")
-
-    # 8. 切歌按钮
-    btn_col1, btn_col2 = st.columns(2)
-    with btn_col1:
-        def prev_song():
+# 曲库换了（歌曲数变化）时重新打乱随机播放顺序
+if "music_shuffle" not in st.session_state or st.session_state.music_shuffle.size != len(library):
+    st.session_state.music_shuffle = ShuffleOrder(len(library))
+if st.session_state.current_music_idx >= len(library):
+    st.session_state.current_music_idx = 0
+
+
+def select_song(idx):
+    st.session_state.current_music_idx = idx
+    st.session_state.progress = 0  # 切换歌曲重置进度
+
+
+# 6~12. 播放器整体是一个局部片段：切歌（上一首、下一首、随机播放）只重跑这个片段，
+# 封面、歌曲信息、音频和列表中的“正在播放”随之更新，不必整页重跑；
+# 播放/暂停、拖动进度和歌曲列表翻页是其中嵌套的片段，只重跑各自那一块
+@st.fragment
+def player():
+    # 6. 获取当前播放的音乐信息
+    current_music = library[st.session_state.current_music_idx]
+
+    # 7. 布局：左侧封面，右侧信息
+    section("歌曲信息")
+    col_cover, col_info = st.columns([1, 2])
+
+    with col_cover:
+        # 显示专辑封面（圆角样式）
+        st.markdown(f"""
+            <div style="border-radius: 12px; overflow: hidden; box-shadow: 0 4px 12px rgba(0,0,0,0.1);">
+                <img src="{current_music['cover_url']}" width="100%" style="display: block;">
+            </div>
+            <p style="text-align: center; margin-top: 8px; color: #8b7369;">专辑封面</p>
+        """, unsafe_allow_html=True)
+
+    with col_info:
+        # 显示歌曲信息
+        st.subheader(f"{current_music['title']}")
+        st.write(f"🎤 歌手: {current_music['artist']}")
+        st.write(f"⏱️ 时长: {current_music['duration']}")
+
+        # 8. 切歌按钮
+        btn_col1, btn_col2 = st.columns(2)
+        with btn_col1:
             # 上一首逻辑：循环切换
-            st.session_state.current_music_idx = (st.session_state.current_music_idx - 1) % len(music_list)
-            st.session_state.progress = 0  # 切换歌曲重置进度
-        
-        st.button("◀◀ 上一首", on_click=prev_song, use_container_width=True)
-    
-    with btn_col2:
-        def next_song():
+            st.button("◀◀ 上一首", on_click=select_song,
+                      args=((st.session_state.current_music_idx - 1) % len(library),), use_container_width=True)
+        with btn_col2:
             # 下一首逻辑：循环切换
-            st.session_state.current_music_idx = (st.session_state.current_music_idx + 1) % len(music_list)
-            st.session_state.progress = 0  # 切换歌曲重置进度
-        
-        st.button("▶▶ 下一首", on_click=next_song, use_container_width=True)
-
-# 9. 播放控制区域
-st.markdown("---")  # 分隔线
-col_play, col_progress, col_volume = st.columns([1, 5, 1])
-
-with col_play:
-    # 播放/暂停按钮逻辑
-    def toggle_play():
-        st.session_state.is_playing = not st.session_state.is_playing
-    
-    play_btn_label = "⏸️ 暂停" if st.session_state.is_playing else "▶️ 播放"
-    st.button(play_btn_label, on_click=toggle_play, use_container_width=True)
-
-with col_progress:
-    # 播放进度条
-    st.session_state.progress = st.slider(
-        "",
-        0, 100,
-        st.session_state.progress,
-        label_visibility="collapsed"
-    )
-    
-    # 计算当前播放时间（模拟）
-    total_seconds = int(current_music['duration'].split(':')[0]) * 60 + int(current_music['duration'].split(':')[1])
-    current_seconds = int(total_seconds * st.session_state.progress / 100)
-    current_time = f"{current_seconds//60}:{current_seconds%60:02d}"
-    
-    # 显示播放时间
-    st.caption(f"{current_time} / {current_music['duration']}")
-
-with col_volume:
-    # 音量按钮
-    st.button("🔊 音量", use_container_width=True)
-
-# 10. 音频播放组件（实际播放音频）
-st.markdown("---")
-st.subheader("🎧 音频播放")
-st.audio(current_music["audio_url"], format="audio/mp3")
-
-# 11. 随机播放按钮（额外功能）
-def random_play():
-    st.session_state.current_music_idx = random.randint(0, len(music_list)-1)
-    st.session_state.progress = 0
-
-st.button("🔀 随机播放", on_click=random_play, use_container_width=True)
-
-# 12. 显示歌曲列表
-st.markdown("---")
-st.subheader("📜 歌曲列表")
-for idx, music in enumerate(music_list):
-    active_tag = " 🟢 正在播放" if idx == st.session_state.current_music_idx else ""
-    st.write(f"{idx+1}. {music['title']} - {music['artist']} {active_tag}")
\ No newline at end of file
+            st.button("▶▶ 下一首", on_click=select_song,
+                      args=((st.session_state.current_music_idx + 1) % len(library),), use_container_width=True)
+
+    # 9. 播放控制区域（嵌套片段：播放/暂停、拖动进度只重跑这一条）
+    section("播放控制")
+    st.markdown("---")  # 分隔线
+
+    @st.fragment
+    def player_controls():
+        col_play, col_progress, col_volume = st.columns([1, 5, 1])
+
+        with col_play:
+            # 播放/暂停按钮逻辑
+            def toggle_play():
+                st.session_state.is_playing = not st.session_state.is_playing
+
+            play_btn_label = "⏸️ 暂停" if st.session_state.is_playing else "▶️ 播放"
+            st.button(play_btn_label, on_click=toggle_play, use_container_width=True)
+
+        with col_progress:
+            # 播放进度条
+            st.slider("播放进度", 0, 100, key="progress", label_visibility="collapsed")
+
+            # 计算当前播放时间（模拟，时长秒数在建曲库时已算好）
+            current_seconds = current_music["seconds"] * st.session_state.progress // 100
+
+            # 显示播放时间
+            st.caption(f"{format_duration(current_seconds)} / {current_music['duration']}")
+
+        with col_volume:
+            # 音量按钮
+            st.button("🔊 音量", use_container_width=True)
+
+    player_controls()
+
+    # 10. 音频播放组件（实际播放音频；播放控制在嵌套片段里，不会重新发送、不会从头播放）
+    st.markdown("---")
+    st.subheader("🎧 音频播放")
+    st.audio(media_url(current_music["audio_url"]), format="audio/mp3")
+
+    # 11. 随机播放按钮（额外功能）：按预先打乱的顺序播放，一轮放完前不重复
+    def random_play():
+        select_song(st.session_state.music_shuffle.next(st.session_state.current_music_idx))
+
+    st.button("🔀 随机播放", on_click=random_play, use_container_width=True)
+
+    # 12. 显示歌曲列表（分页，每次只渲染一页；翻页只重跑列表）
+    section("歌曲列表")
+    st.markdown("---")
+    st.subheader("📜 歌曲列表")
+
+    @st.fragment
+    def song_list():
+        pages = library.page_count()
+        page_no = 0
+        if pages > 1:
+            page_no = st.number_input(f"页码（共 {pages} 页，{len(library)} 首）", 1, pages, 1, key="music_list_page") - 1
+        for idx, music in library.page(page_no):
+            active_tag = " 🟢 正在播放" if idx == st.session_state.current_music_idx else ""
+            st.write(f"{idx+1}. {music['title']} - {music['artist']} {active_tag}")
+
+    song_list()
+
+
+player()
+
+render_profile_panel()
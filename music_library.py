@@ -0,0 +1,187 @@
+"""音乐播放器的曲库和播放顺序
+
+曲库来自一个 JSON 文件（歌曲字典的列表，字段同 music.py 中的 music_list），解析后的结果
+（包括换算好的时长秒数）缓存到 .cache/music/，文件没有变化时直接读取缓存。
+曲库文件默认为 data/music_library.json，可通过环境变量 PET_HOME_MUSIC_LIBRARY 修改；不存在时使用页面内置的歌曲。
+
+命令行用法：
+    python music_library.py build --synthetic 5000   # 生成5000首模拟歌曲，用于压测
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import random
+import threading
+
+from app_cache import get_cache_dir
+from profiling import profiled
+
+MUSIC_LIBRARY_PATH = os.environ.get(
+    "PET_HOME_MUSIC_LIBRARY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "music_library.json")
+)
+PAGE_SIZE = 20
+
+
+def parse_duration(text):
+    """"4:18" 或 "1:02:03" 换算成秒数，格式不对时返回0"""
+    try:
+        seconds = 0
+        for part in str(text).split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    except ValueError:
+        return 0
+
+
+def format_duration(seconds):
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class MusicLibrary:
+    """曲库：按序号随机访问、按页切片，每首歌的时长秒数在建库时算好"""
+
+    def __init__(self, tracks, version=""):
+        self.tracks = [dict(track, seconds=parse_duration(track.get("duration"))) for track in tracks]
+        self.version = version  # 曲库内容标识，曲库文件变化后会变
+        self._by_audio_url = {track["audio_url"]: idx for idx, track in enumerate(self.tracks)}
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def __getitem__(self, idx):
+        return self.tracks[idx]
+
+    def index_of(self, audio_url):
+        return self._by_audio_url.get(audio_url)
+
+    def page_count(self, page_size=PAGE_SIZE):
+        return max(1, -(-len(self.tracks) // page_size))
+
+    def page(self, page_no, page_size=PAGE_SIZE):
+        """第 page_no 页（从0开始）的 [(序号, 歌曲)]，只切出这一页"""
+        start = page_no * page_size
+        return list(enumerate(self.tracks[start:start + page_size], start))
+
+
+class ShuffleOrder:
+    """随机播放顺序：预先打乱一轮，每次取下一首是O(1)；一轮放完之前不会重复，放完再打乱一轮"""
+
+    def __init__(self, size, rng=None):
+        self.size = size
+        self._rng = rng or random.Random()
+        self._order = []
+        self._position = 0
+
+    def _reshuffle(self, current):
+        self._order = list(range(self.size))
+        self._rng.shuffle(self._order)
+        self._position = 0
+        # 新一轮的第一首不和刚放完的那首相同
+        if self.size > 1 and self._order[0] == current:
+            self._order[0], self._order[-1] = self._order[-1], self._order[0]
+
+    def next(self, current=None):
+        if self.size == 0:
+            return None
+        if self._position >= len(self._order):
+            self._reshuffle(current)
+        idx = self._order[self._position]
+        self._position += 1
+        return idx
+
+
+def _cache_path(path):
+    """曲库文件路径+修改时间+大小决定缓存文件名，文件更新后自动失效"""
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return os.path.join(get_cache_dir("music"), hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".pickle")
+
+
+def _read_library(path):
+    cache_file = _cache_path(path)
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        pass  # 没有缓存或缓存损坏：重新解析
+    with open(path, encoding="utf-8") as f:
+        library = MusicLibrary(json.load(f), version=os.path.basename(cache_file))
+    tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            pickle.dump(library, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        if os.path.exists(tmp_file):
+            os.unlink(tmp_file)
+    return library
+
+
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+
+@profiled("加载曲库")
+def load_music_library(default_tracks, path=MUSIC_LIBRARY_PATH, default_version=None):
+    """进程内共享的曲库：曲库文件存在时读取（带磁盘缓存），否则使用 default_tracks
+
+    default_version 标识 default_tracks 的内容（如内容文件的修改时间），变化后重新建库；
+    不传时按歌曲内容计算摘要。
+    """
+    try:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        builtin = False
+    except OSError:
+        if default_version is None:
+            raw = json.dumps([dict(track) for track in default_tracks], ensure_ascii=False, sort_keys=True)
+            default_version = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        key = ("builtin", default_version)
+        builtin = True
+    with _libraries_lock:
+        if key not in _libraries:
+            # 同一个曲库文件（或内置歌曲）只保留最新的一份，旧版本不再常驻内存
+            for old_key in [old_key for old_key in _libraries if old_key[0] == key[0]]:
+                del _libraries[old_key]
+            if builtin:
+                _libraries[key] = MusicLibrary(default_tracks, version=f"builtin-{default_version}")
+            else:
+                _libraries[key] = _read_library(path)
+        return _libraries[key]
+
+
+def build_synthetic_library(count, path, seed=0):
+    """生成指定数量的模拟歌曲（链接指向示例地址），用于压测"""
+    rng = random.Random(seed)
+    tracks = [
+        {
+            "cover_url": "https://puui.qpic.cn/media_img/0/1087111581842036/0",
+            "title": f"模拟歌曲 {i + 1}",
+            "artist": f"歌手 {rng.randint(1, 200)}",
+            "duration": format_duration(rng.randint(120, 360)),
+            "audio_url": f"https://music.163.com/song/media/outer/url?id={1000000 + i}.mp3"
+        }
+        for i in range(count)
+    ]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(tracks, f, ensure_ascii=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成音乐播放器的曲库文件")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--synthetic", type=int, required=True, metavar="N", help="生成N首模拟歌曲")
+    parser.add_argument("--output", default=MUSIC_LIBRARY_PATH, help="曲库文件路径")
+    args = parser.parse_args(argv)
+
+    path = build_synthetic_library(args.synthetic, args.output)
+    print(f"已生成 {args.synthetic} 首歌曲：{path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import streamlit as st
+from profiling import render_profile_panel, section, start_profiling
+from site_content import get_content  # 首页介绍等静态内容在 data/site_content.json，所有会话共享一份
+
+start_profiling("首页")  # 地址加 ?profile=1 时在侧边栏显示各段落耗时
 
 # 原“首页”的核心代码（替换本地图片+修正宽度参数）
+section("封面图")
 st.title("🏫 首页")
 
 # 本地图片路径（用原始字符串r""避免Windows路径转义错误）
@@ -14,10 +19,7 @@ st.image(
 )
 
 # 首页文字介绍
-st.write("""
-### 🐾 欢迎来到「毛孩子星球」—— 这里是爱宠人士的专属港湾，更是萌宠们的幸福乐园！
-
-无论是软萌粘人的猫咪、热情活力的狗狗，还是灵动可爱的小宠，我们始终相信，每一只毛孩子都是家庭中不可或缺的重要成员。在这里，你能找到一站式宠物生活解决方案：精选高性价比的用品好物（口粮、玩具、洗护、家居），解锁专业科学的养护知识（喂养指南、健康科普、行为训练），邂逅志同道合的宠友社群（晒娃分享、经验交流、线下聚会），更有贴心的本地服务推荐（宠物医院、寄养托管、美容洗护）。
+section("首页介绍")
+st.write(get_content("home_intro"))
 
-我们以「科学养宠、温暖陪伴」为初心，用专业与热爱，守护每一段人与宠物的美好缘分。愿每一只毛孩子都能健康快乐成长，每一份铲屎官的爱都能被温柔回应～ 现在就开启你的专属宠友之旅吧！🐱🐶🐰
-""")
\ No newline at end of file
+render_profile_panel()
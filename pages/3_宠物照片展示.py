@@ -1,4 +1,9 @@
 import streamlit as st
+from profiling import render_profile_panel, section, start_profiling
+from gallery_index import render_gallery_grid
+from image_cache import cached_image, preload_neighbors  # 原图只下载一次，按展示宽度发送缩小后的图片
+from theme import apply_theme  # 样式在 themes/ 目录，每个进程只编译一次
+from site_content import get_content  # 剧集、歌曲、图片等静态内容在 data/site_content.json，所有会话共享一份
 
 # 设置页面配置（标题、图标）
 st.set_page_config(
@@ -6,59 +11,28 @@ st.set_page_config(
     page_icon="🖼️",
     layout="centered"
 )
+start_profiling("宠物照片展示")  # 地址加 ?profile=1 时在侧边栏显示各段落耗时
 
+section("页面样式")
 # 自定义莫兰迪马卡龙蓝灰色背景样式
-st.markdown(
-    """
-    <style>
-    .stApp {
-        background-color: #E0E5EC;  /* 莫兰迪蓝灰色 */
-    }
-    .stImage {
-        border-radius: 10px;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-    }
-    .caption {
-        font-size: 18px;
-        color: #5A6A85;
-        text-align: center;
-        margin-top: 10px;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+apply_theme("photo")
 
+section("相册")
 # 初始化图片索引（session_state存储）
 if 'ind' not in st.session_state:
     st.session_state['ind'] = 0
 
 # 图片列表（至少3张，包含url和图注）
-images = [
-    {
-        'url': "https://images.unsplash.com/photo-1543466835-00a7907e9de1?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80",
-        'text': "乖乖小狗"
-    },
-    {
-        'url': "https://images.unsplash.com/photo-1507146426996-ef05306b995a?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80",
-        'text': "小鸡毛"
-    },
-    {
-        'url': "https://images.unsplash.com/photo-1535930891776-0c2dfb7fda1a?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80",
-        'text': "大鸡毛"
-    },
-    {
-        'url': "https://imgs.699pic.com/images/501/028/820.jpg!list1x.v2",
-        'text': "贱兮兮柴犬"
-    }
-]
+images = get_content("photos")
 
 # 标题
 st.title("莫兰迪马卡龙相册")
 
 # 显示当前图片和图注
 current_img = images[st.session_state['ind']]
-st.image(current_img['url'], use_column_width=True, caption=current_img['text'])
+st.image(cached_image(current_img['url'], width=800), use_column_width=True, caption=current_img['text'])
+# 预取前后两张，翻页时不用再等图片加载
+preload_neighbors([img['url'] for img in images], st.session_state['ind'], width=800, key="photo_preload")
 
 # 切换图片函数
 def next_img():
@@ -72,4 +46,12 @@ col1, col2 = st.columns(2)
 with col1:
     st.button("上一张", on_click=prev_img)
 with col2:
-    st.button("下一张", on_click=next_img)
\ No newline at end of file
+    st.button("下一张", on_click=next_img)
+
+section("图库")
+# 图库目录中的全部照片：分页缩略图，只加载当前页
+st.markdown("---")
+st.subheader("📁 宠物图库")
+render_gallery_grid("photo_")
+
+render_profile_panel()
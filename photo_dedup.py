@@ -0,0 +1,189 @@
+"""照片感知哈希去重：同一张（或只是压缩、缩放过的）照片只处理、只存一份
+
+每张照片计算两个64位感知哈希（灰度缩小后用NumPy比较像素）：
+    dHash：相邻像素的明暗变化，用于在BK树中按汉明距离查找近似照片
+    aHash：像素与均值的比较，用于复核dHash找到的候选
+BK树按汉明距离组织，查找半径很小时只需访问很少的节点，不必逐一比较全部照片。
+"""
+import io
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import numpy as np
+from PIL import Image
+
+from app_cache import get_cache_dir
+
+HASH_SIZE = 8
+NEAR_DISTANCE = 5  # dHash 汉明距离不超过它的视为候选
+AHASH_DISTANCE = 10  # aHash 对亮度整体变化更敏感，复核时放宽一些
+
+
+def _to_signed(value):
+    """SQLite 的 INTEGER 是有符号64位，哈希按补码存取"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+def compute_hashes(source):
+    """计算照片的 (dHash, aHash)，source 为图片字节或文件路径"""
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as img:
+        # JPEG在解码阶段直接缩小，哈希只需要很小的灰度图
+        img.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))
+        gray = img.convert("L")
+    pixels = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    dhash = _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+    pixels = np.asarray(gray.resize((HASH_SIZE, HASH_SIZE), Image.LANCZOS), dtype=np.float32)
+    ahash = _bits_to_int(pixels > pixels.mean())
+    return dhash, ahash
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """按汉明距离组织的BK树：节点为 [哈希, 条目列表, {距离: 子节点}]"""
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value, item):
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """距离不超过 max_distance 的全部条目，返回按距离排序的 [(距离, 条目)]"""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend((distance, item) for item in node[1])
+            # 三角不等式：只有边长在 [d-r, d+r] 内的子树可能有结果
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found, key=lambda pair: pair[0])
+
+
+class PhotoDedupIndex:
+    """已有照片的感知哈希索引：SQLite 持久化，进程内用BK树查找，线程安全
+
+    每条记录：key（图库照片为 "gallery:相对路径"）、两个哈希、来源、对应文件路径。
+    图库新照片入库前用 find 查找近似照片，沿用其缩略图（见 gallery_index）。
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_cache_dir("dedup"), "assets.sqlite")
+        self._lock = threading.Lock()
+        self._tree = BKTree()
+        self._assets = {}  # key -> {"dhash", "ahash", "source", "path"}
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS assets ("
+                "key TEXT PRIMARY KEY, dhash INTEGER, ahash INTEGER, source TEXT, path TEXT)"
+            )
+            for key, dhash, ahash, source, path in conn.execute("SELECT * FROM assets"):
+                self._insert(key, _to_unsigned(dhash), _to_unsigned(ahash), source, path)
+
+    def __len__(self):
+        return len(self._assets)
+
+    def _insert(self, key, dhash, ahash, source, path):
+        old = self._assets.get(key)
+        self._assets[key] = {"key": key, "dhash": dhash, "ahash": ahash, "source": source, "path": path}
+        # 哈希没变时树里已有这个key；变了的旧节点留在树里，查找时按 _assets 复核后自然被过滤
+        if old is None or old["dhash"] != dhash:
+            self._tree.add(dhash, key)
+
+    def find(self, data=None, key=None, hashes=None, max_distance=NEAR_DISTANCE):
+        """查找与给定照片相同或近似的已有照片，返回 (最接近的记录或None, 这张照片的哈希)
+
+        先按 key 精确匹配（不解码图片）；再用 dHash 在BK树里找候选，aHash 复核。
+        """
+        with self._lock:
+            if key is not None and key in self._assets:
+                return dict(self._assets[key], distance=0), None
+        if hashes is None:
+            hashes = compute_hashes(data)
+        dhash, ahash = hashes
+        best = None
+        with self._lock:
+            for _, candidate in self._tree.search(dhash, max_distance):
+                asset = self._assets.get(candidate)
+                if asset is None:
+                    continue
+                # 按记录当前的哈希复核（树中可能留有已删除或已更新的旧节点）
+                distance = hamming(asset["dhash"], dhash)
+                if distance > max_distance or hamming(asset["ahash"], ahash) > AHASH_DISTANCE:
+                    continue
+                if best is None or distance < best["distance"]:
+                    best = dict(asset, distance=distance)
+        return best, hashes
+
+    def add_many(self, entries):
+        """登记照片：entries 为 (key, (dHash, aHash), 来源, 文件路径) 的列表"""
+        if not entries:
+            return
+        with self._lock, closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?)",
+                [(key, _to_signed(dhash), _to_signed(ahash), source, path) for key, (dhash, ahash), source, path in entries]
+            )
+            for key, (dhash, ahash), source, path in entries:
+                self._insert(key, dhash, ahash, source, path)
+
+    def add(self, key, hashes, source, path):
+        self.add_many([(key, hashes, source, path)])
+
+    def remove(self, keys):
+        """删除记录（BK树中的节点保留，查找时会被过滤掉）"""
+        if not keys:
+            return
+        with self._lock, closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+            conn.executemany("DELETE FROM assets WHERE key = ?", [(key,) for key in keys])
+            for key in keys:
+                self._assets.pop(key, None)
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_dedup_index():
+    """进程内共享的去重索引"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = PhotoDedupIndex()
+        return _default_index
@@ -0,0 +1,178 @@
+"""按需开启的耗时分析：页面地址加 ?profile=1 时，在侧边栏显示本次运行各段落的耗时
+
+只有服务端设置了环境变量 PET_HOME_PROFILING=1 才生效，否则地址参数被忽略（访客不能随意开启）：
+    ?profile=1         记录各段落、各热点函数的耗时，侧边栏显示耗时表
+    ?profile=cprofile  同时用 cProfile 采样整次运行，结果写入 .cache/profiles/*.pstats（只保留最近 MAX_PROFILE_DUMPS 个）
+
+用法：页面开头调用 start_profiling("页面名")，各段落前调用 section("段落名")，
+热点函数加 @profiled("名称") 装饰，页面末尾调用 render_profile_panel()。
+未开启时所有调用都只是一次线程局部变量的读取，不影响正常运行。
+"""
+import cProfile
+import datetime
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILING_ENABLED = os.environ.get("PET_HOME_PROFILING", "") not in ("", "0")
+MAX_PROFILE_DUMPS = 20
+
+# 每个脚本线程各自记录，后台线程（导出队列、链接检测）不参与
+_local = threading.local()
+
+
+class _Recorder:
+    def __init__(self, page, use_cprofile=False):
+        self.page = page
+        self.started = time.perf_counter()
+        self.records = []  # [名称, 层级, 开始时间, 耗时]
+        self.depth = 0
+        self.section = None
+        self.profiler = None
+        if use_cprofile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                self.profiler = profiler
+            except ValueError:  # 已有其他分析器在运行
+                pass
+
+    def close_section(self):
+        if self.section is not None:
+            self.section[3] = time.perf_counter() - self.section[2]
+            self.section = None
+            self.depth = 0
+
+    def stop(self):
+        self.close_section()
+        if self.profiler is not None:
+            self.profiler.disable()
+        return time.perf_counter() - self.started
+
+
+def _current():
+    return getattr(_local, "recorder", None)
+
+
+def start_profiling(page):
+    """页面开头调用：地址栏带 profile 参数时开始记录本次运行"""
+    import streamlit as st
+
+    old = _current()
+    if old is not None:
+        # 上次运行中途被 st.rerun / st.stop 打断，没有走到 render_profile_panel
+        old.stop()
+        _local.recorder = None
+    if not PROFILING_ENABLED:
+        return
+    mode = st.query_params.get("profile")
+    _local.recorder = _Recorder(page, use_cprofile=mode == "cprofile") if mode in ("1", "true", "cprofile") else None
+
+
+def section(name):
+    """开始一个新的顶层段落（上一个段落随之结束）"""
+    recorder = _current()
+    if recorder is None:
+        return
+    recorder.close_section()
+    recorder.section = [name, 0, time.perf_counter(), None]
+    recorder.records.append(recorder.section)
+    recorder.depth = 1
+
+
+@contextmanager
+def span(name):
+    """计时一个代码块，嵌套的块在耗时表中缩进显示"""
+    recorder = _current()
+    if recorder is None:
+        yield
+        return
+    record = [name, recorder.depth, time.perf_counter(), None]
+    recorder.records.append(record)
+    recorder.depth += 1
+    try:
+        yield
+    finally:
+        recorder.depth -= 1
+        record[3] = time.perf_counter() - record[2]
+
+
+def profiled(name):
+    """把函数的每次调用记为一个计时块"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _remove_old_dumps(directory, keep):
+    dumps = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".pstats"):
+            try:
+                dumps.append((entry.stat().st_mtime_ns, entry.path))
+            except OSError:
+                continue
+    for _, path in sorted(dumps)[:max(0, len(dumps) - keep)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _dump_cprofile(recorder):
+    """写入 .pstats 文件并删掉更早的，返回 (文件名, 前20个函数的文字摘要)"""
+    from app_cache import get_cache_dir
+
+    directory = get_cache_dir("profiles")
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    name = f"{recorder.page}_{stamp}.pstats"
+    recorder.profiler.dump_stats(os.path.join(directory, name))
+    _remove_old_dumps(directory, MAX_PROFILE_DUMPS)
+    text = io.StringIO()
+    pstats.Stats(recorder.profiler, stream=text).sort_stats("cumulative").print_stats(20)
+    return name, text.getvalue()
+
+
+def render_profile_panel():
+    """页面末尾调用：在侧边栏显示本次运行的耗时表（未开启时什么都不做）"""
+    recorder = _current()
+    if recorder is None:
+        return
+    _local.recorder = None
+    total = recorder.stop()
+
+    import pandas as pd
+    import streamlit as st
+
+    rows = [
+        {
+            "段落": "　" * depth + ("└ " if depth else "") + name,
+            "耗时(ms)": round((duration or 0) * 1000, 1),
+            "占比": (duration or 0) / total if total else 0
+        }
+        for name, depth, _, duration in recorder.records
+    ]
+    with st.sidebar:
+        st.markdown(f"#### ⏱️ 耗时分析：{recorder.page}")
+        st.caption(f"本次运行共 {total * 1000:.1f} ms")
+        st.dataframe(
+            pd.DataFrame(rows, columns=["段落", "耗时(ms)", "占比"]),
+            hide_index=True,
+            use_container_width=True,
+            column_config={"占比": st.column_config.ProgressColumn("占比", min_value=0, max_value=1, format="percent")}
+        )
+        if recorder.profiler is not None:
+            name, summary = _dump_cprofile(recorder)
+            st.caption(f"cProfile 结果已保存到缓存目录 profiles/{name}")
+            with st.expander("累计耗时前20的函数"):
+                st.code(summary)
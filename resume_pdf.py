@@ -0,0 +1,317 @@
+import datetime
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+from PIL import Image as PILImage
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+
+from font_registry import register_chinese_font
+from profiling import profiled, span
+
+# 简历表单字段（顺序与 generate_resume_pdf 的参数一致，头像单独处理）
+RESUME_FIELDS = [
+    "name", "nickname", "birth_date", "gender", "education", "work_exp",
+    "salary_min", "salary_max", "grad_info", "job_intention", "job_city",
+    "arrival_time", "phone", "email", "address", "id_card", "skills", "experience", "intro"
+]
+
+AVATAR_SIZE = (150, 150)
+
+_styles_lock = threading.Lock()
+_styles = None
+
+
+def get_resume_styles():
+    """简历用到的段落样式，每个进程只构建一次"""
+    global _styles
+    if _styles is not None:
+        return _styles
+
+    with _styles_lock:
+        if _styles is not None:
+            return _styles
+
+        font_name = register_chinese_font()
+        base = getSampleStyleSheet()
+        _styles = {
+            "title": ParagraphStyle(
+                'CustomTitle',
+                parent=base['Heading1'],
+                fontName=font_name,
+                fontSize=20,
+                spaceAfter=10,
+                textColor=colors.HexColor("#8B6B89"),
+                alignment=0
+            ),
+            "sub_title": ParagraphStyle(
+                'CustomSubtitle',
+                parent=base['Heading2'],
+                fontName=font_name,
+                fontSize=14,
+                spaceAfter=8,
+                textColor=colors.HexColor("#8B6B89"),
+                alignment=0
+            ),
+            "normal": ParagraphStyle(
+                'CustomNormal',
+                parent=base['Normal'],
+                fontName=font_name,
+                fontSize=11,
+                spaceAfter=5,
+                textColor=colors.HexColor("#4A4A4A"),
+                alignment=0,
+                allowWidows=0,
+                allowOrphans=0
+            )
+        }
+        return _styles
+
+
+def make_avatar_thumbnail(avatar_bytes, size=AVATAR_SIZE):
+    """把上传的头像解码一次并缩放为PNG缩略图字节；已经是缩略图时原样返回"""
+    img = PILImage.open(io.BytesIO(avatar_bytes))
+    if img.format == "PNG" and img.width <= size[0] and img.height <= size[1]:
+        return avatar_bytes
+    # JPEG可在解码阶段按比例缩小（draft模式），大照片不必完整解码
+    img.draft("RGB", (size[0] * 2, size[1] * 2))
+    img.thumbnail(size)
+    if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        img = img.convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def build_resume_story(fields, avatar_bytes=None, on_warning=None):
+    """根据表单字段生成Platypus story（元素列表）"""
+    styles = get_resume_styles()
+    title_style = styles["title"]
+    sub_title_style = styles["sub_title"]
+    normal_style = styles["normal"]
+    elements = []
+
+    name = fields["name"]
+    nickname = fields["nickname"]
+    job_city = fields["job_city"]
+    job_intention = fields["job_intention"]
+    phone, email, address, id_card = fields["phone"], fields["email"], fields["address"], fields["id_card"]
+    skills = fields["skills"]
+    experience = fields["experience"]
+    intro = fields["intro"]
+
+    name_text = name if name else "你的姓名"
+    elements.append(Paragraph(name_text, title_style))
+
+    basic_info = (
+        f"昵称：{nickname if nickname else '暂无'} | "
+        f"{fields['birth_date'].strftime('%Y年%m月')}出生 | "
+        f"性别：{fields['gender']} | 学历：{fields['education']}"
+    )
+    elements.append(Paragraph(basic_info, normal_style))
+    elements.append(Spacer(1, 10))
+
+    elements.append(Paragraph("求职意向", sub_title_style))
+    job_city_text = ', '.join(job_city) if job_city else '暂无'
+    intention_info = (
+        f"意向岗位：{job_intention if job_intention else '暂无'}\n"
+        f"意向城市：{job_city_text}\n"
+        f"到岗时间：{fields['arrival_time']}\n"
+        f"期望薪资：{fields['salary_min']}-{fields['salary_max']}元/月 | 工作经验：{fields['work_exp']}年"
+    )
+    elements.append(Paragraph(intention_info, normal_style))
+    elements.append(Spacer(1, 10))
+
+    elements.append(Paragraph("联系方式", sub_title_style))
+    contact_info = (
+        f"电话：{phone if phone else '暂无'}\n"
+        f"邮箱：{email if email else '暂无'}\n"
+        f"地址：{address if address else '暂无'}\n"
+        f"身份证号：{id_card if id_card else '未填写'}"
+    )
+    elements.append(Paragraph(contact_info, normal_style))
+    elements.append(Spacer(1, 10))
+
+    elements.append(Paragraph("毕业信息", sub_title_style))
+    elements.append(Paragraph(f"毕业院校及时间：{fields['grad_info']}", normal_style))
+    elements.append(Spacer(1, 10))
+
+    elements.append(Paragraph("专业技能", sub_title_style))
+    skill_text = "、".join(skills) if skills else "暂未填写"
+    elements.append(Paragraph(skill_text, normal_style))
+    elements.append(Spacer(1, 10))
+
+    elements.append(Paragraph("个人经历", sub_title_style))
+    if experience.strip():
+        exp_lines = [line.strip() for line in experience.strip().split('\n') if line.strip()]
+        exp_text = "\n".join(exp_lines)
+        elements.append(Paragraph(exp_text, normal_style))
+    else:
+        elements.append(Paragraph("暂未填写", normal_style))
+    elements.append(Spacer(1, 10))
+
+    elements.append(Paragraph("个人简介", sub_title_style))
+    intro_text = intro if intro else "✨ 这个人很温柔，还没有留下介绍哦～"
+    elements.append(Paragraph(intro_text, normal_style))
+
+    if avatar_bytes:
+        try:
+            # 缩略图直接以内存流交给reportlab，不落盘
+            thumbnail = make_avatar_thumbnail(avatar_bytes)
+            elements.append(Spacer(1, 15))
+            img_obj = Image(io.BytesIO(thumbnail), width=1.5*inch, height=1.5*inch)
+            img_obj.hAlign = 'RIGHT'
+            elements.append(img_obj)
+        except Exception as e:
+            if on_warning is not None:
+                on_warning(f"头像处理失败：{str(e)}")
+
+    return elements
+
+
+class ExportCancelled(Exception):
+    """PDF排版过程中被用户取消"""
+
+
+class _ProgressDocTemplate(SimpleDocTemplate):
+    """每排完一个元素回报一次进度，并检查是否已被取消"""
+
+    def __init__(self, buffer, total, on_progress=None, cancel_event=None, **kwargs):
+        super().__init__(buffer, **kwargs)
+        self._total = max(total, 1)
+        self._done = 0
+        self._on_progress = on_progress
+        self._cancel_event = cancel_event
+
+    def afterFlowable(self, flowable):
+        self._done += 1
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise ExportCancelled()
+        if self._on_progress is not None:
+            self._on_progress(min(self._done / self._total, 1.0))
+
+
+@profiled("生成PDF")
+def render_resume_pdf(fields, avatar_bytes=None, on_warning=None, on_progress=None, cancel_event=None):
+    """排版并输出PDF字节（不走缓存）；on_progress 接收0~1的进度，cancel_event 被设置时抛出 ExportCancelled"""
+    elements = build_resume_story(fields, avatar_bytes, on_warning)
+    buffer = io.BytesIO()
+    doc = _ProgressDocTemplate(
+        buffer,
+        total=len(elements),
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+        pagesize=A4,
+        rightMargin=inch/2,
+        leftMargin=inch/2,
+        topMargin=inch/2,
+        bottomMargin=inch/2
+    )
+    with span("doc.build"):
+        doc.build(elements)
+    return buffer.getvalue()
+
+
+def _normalize(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def resume_cache_key(fields, avatar_bytes=None):
+    """规范化后的表单字段 + 头像字节 的SHA-256，作为内容寻址的缓存键"""
+    normalized = {key: _normalize(fields[key]) for key in RESUME_FIELDS}
+    digest = hashlib.sha256(json.dumps(normalized, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(avatar_bytes or b"")
+    return digest.hexdigest()
+
+
+class PdfRenderCache:
+    """按总字节数淘汰的LRU缓存，线程安全，所有会话共享"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old)
+            if len(data) > self.max_bytes:
+                return  # 超过上限的不缓存（同时丢掉这个键的旧内容）
+            self._items[key] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def __len__(self):
+        return len(self._items)
+
+
+pdf_cache = PdfRenderCache()
+
+
+def get_resume_pdf(fields, avatar_bytes=None, on_warning=None, on_progress=None, cancel_event=None):
+    """带缓存的PDF生成：相同内容直接返回已生成的PDF字节"""
+    key = resume_cache_key(fields, avatar_bytes)
+    data = pdf_cache.get(key)
+    if data is None:
+        data = render_resume_pdf(fields, avatar_bytes, on_warning, on_progress, cancel_event)
+        pdf_cache.put(key, data)
+    return data
+
+
+def collect_resume_fields(
+    name, nickname, birth_date, gender, education, work_exp,
+    salary_min, salary_max, grad_info, job_intention, job_city,
+    arrival_time, phone, email, address, id_card, skills, experience, intro
+):
+    """按 RESUME_FIELDS 的顺序把表单值整理成字典"""
+    return dict(zip(RESUME_FIELDS, [
+        name, nickname, birth_date, gender, education, work_exp,
+        salary_min, salary_max, grad_info, job_intention, job_city,
+        arrival_time, phone, email, address, id_card, skills, experience, intro
+    ]))
+
+
+def generate_resume_pdf(
+    name, nickname, birth_date, gender, education, work_exp,
+    salary_min, salary_max, grad_info, job_intention, job_city,
+    arrival_time, phone, email, address, id_card, skills, experience, intro, avatar,
+    on_warning=None
+):
+    """兼容原有页面调用方式的入口：avatar 为上传的文件对象或图片字节（可直接传缩略图），返回PDF的BytesIO"""
+    fields = collect_resume_fields(
+        name, nickname, birth_date, gender, education, work_exp,
+        salary_min, salary_max, grad_info, job_intention, job_city,
+        arrival_time, phone, email, address, id_card, skills, experience, intro
+    )
+    if avatar is None or isinstance(avatar, bytes):
+        avatar_bytes = avatar
+    else:
+        avatar_bytes = avatar.getvalue()
+    return io.BytesIO(get_resume_pdf(fields, avatar_bytes, on_warning))
@@ -0,0 +1,139 @@
+"""个人简历页的实时预览：按分区生成HTML，每个分区只在它用到的字段改动后才重新拼接
+
+各分区的HTML连同生成时的字段版本号（ResumeState.field_version）缓存在会话中，输入任意一项时，
+只有包含该字段的分区重新拼接，其余分区直接复用上次的字符串。Streamlit 每次重跑仍会把每个分区
+作为一个元素发送（内容不变的元素浏览器端不会重新绘制），这里省掉的是拼接HTML和拆分文本的工作。
+个人经历在内容变化时拆分一次，所有经历卡片合并成一个元素输出，不再每次重跑都 split 并逐行输出。
+用户填写的文字都经过 HTML 转义，输入的标签会原样显示为文字。
+"""
+import html
+
+import streamlit as st
+
+AVATAR_PLACEHOLDER = "https://api.dicebear.com/7.x/avataaars-neutral/svg?seed=girl&accessories=round&hair=longStraight&clothes=blazerShirt"
+SKILL_TAG_STYLE = "background-color:#F0E0E6; color:#8B6B89; padding:4px 10px; border-radius:20px; margin:0 5px 5px 0; display:inline-block;"
+
+
+def _text(value, placeholder=""):
+    return html.escape(str(value)) if value else placeholder
+
+
+def _header_html(state):
+    return (
+        f"<h3 style='color:#8B6B89; margin-bottom: 8px;'>{_text(state.name, '你的姓名')}</h3>"
+        f"<p style='color:#808495; font-size:14px;'>昵称：{_text(state.nickname, '暂无')} | "
+        f"{state.birth_date.strftime('%Y年%m月')}出生</p>"
+    )
+
+
+def _basic_html(state):
+    salary_min, salary_max = state.salary_range
+    return (
+        f"<p>👧 性别：{state.gender}</p>"
+        f"<p>🎓 学历：{state.education}</p>"
+        f"<p>💼 工作经验：{state.work_exp}年</p>"
+        f"<p>💰 期望薪资：{salary_min}-{salary_max}元/月</p>"
+        f"<p>🎓 毕业信息：{_text(state.resolved_grad_info())}</p>"
+    )
+
+
+def _intention_html(state):
+    job_city = state.resolved_job_city()
+    return (
+        f"<p><strong>意向岗位：</strong>{_text(state.resolved_job_intention(), '暂无')}</p>",
+        f"<p><strong>意向城市：</strong>{_text(', '.join(job_city), '暂无')}</p>",
+        f"<p><strong>到岗时间：</strong>{state.arrival_time}</p>",
+    )
+
+
+def _contact_html(state):
+    return (
+        f"<p>电话：{_text(state.phone, '暂无')}</p><p>邮箱：{_text(state.email, '暂无')}</p>",
+        f"<p>地址：{_text(state.address, '暂无')}</p><p>身份证号：{_text(state.id_card, '未填写')}</p>",
+    )
+
+
+def _skills_html(state):
+    if not state.skills:
+        return "<p>暂未填写技能信息，快去左侧选择吧～</p>"
+    return " ".join(f"<span style='{SKILL_TAG_STYLE}'>{_text(skill)}</span>" for skill in state.skills)
+
+
+def _experience_html(state):
+    # 只在经历内容改动后执行一次：拆行、去空行，所有卡片拼成一段HTML
+    lines = [line.strip() for line in state.experience.splitlines() if line.strip()]
+    if not lines:
+        return "<p>暂未填写个人经历，快去左侧补充吧～</p>"
+    return "".join(f"<div class='experience-card'>{_text(line)}</div>" for line in lines)
+
+
+def _intro_html(state):
+    return f"<p>{_text(state.intro, '✨ 这个人很温柔，还没有留下介绍哦～')}</p>"
+
+
+# 分区名 -> (用到的字段, 生成HTML的函数)
+SECTIONS = {
+    "header": (("name", "nickname", "birth_date"), _header_html),
+    "basic": (("gender", "education", "work_exp", "salary_range", "grad_info", "grad_info_custom"), _basic_html),
+    "intention": (("job_intention", "job_intention_custom", "job_city", "custom_city", "arrival_time"), _intention_html),
+    "contact": (("phone", "email", "address", "id_card"), _contact_html),
+    "skills": (("skills",), _skills_html),
+    "experience": (("experience",), _experience_html),
+    "intro": (("intro",), _intro_html),
+}
+
+
+CACHE_KEY = "resume_preview_cache"
+
+
+def section_html(state, name, cache=None):
+    """分区的HTML：字段版本号没变时直接返回缓存（重置后 generation 不同，缓存随之失效）
+
+    cache 为 {分区名: (版本, HTML)} 字典，默认放在会话状态里。
+    """
+    fields, build = SECTIONS[name]
+    if cache is None:
+        cache = st.session_state.setdefault(CACHE_KEY, {})
+    version = (state.generation, state.field_version(*fields))
+    cached = cache.get(name)
+    if cached is None or cached[0] != version:
+        cached = cache[name] = (version, build(state))
+    return cached[1]
+
+
+def _markdown(body):
+    st.markdown(body, unsafe_allow_html=True)
+
+
+def render_resume_preview(state, avatar_thumbnail=None):
+    """在当前容器中绘制简历预览"""
+    _markdown('<div class="preview-card">')
+    _markdown(section_html(state, "header"))
+
+    info_col1, info_col2 = st.columns([0.3, 0.7])
+    with info_col1:
+        if avatar_thumbnail:
+            st.image(avatar_thumbnail, width=120, caption="个人照片")
+        else:
+            st.image(AVATAR_PLACEHOLDER, width=120, caption="头像占位")
+    with info_col2:
+        _markdown(section_html(state, "basic"))
+
+    st.markdown("---")
+    st.subheader("🎯 求职意向", anchor=False)
+    for column, body in zip(st.columns(3), section_html(state, "intention")):
+        with column:
+            _markdown(body)
+
+    st.markdown("---")
+    st.subheader("📞 联系方式", anchor=False)
+    for column, body in zip(st.columns(2), section_html(state, "contact")):
+        with column:
+            _markdown(body)
+
+    for title, name in (("💻 专业技能", "skills"), ("📜 个人经历", "experience"), ("💬 个人简介", "intro")):
+        st.markdown("---")
+        st.subheader(title, anchor=False)
+        _markdown(section_html(state, name))
+
+    _markdown('</div>')
@@ -0,0 +1,112 @@
+"""简历表单的会话状态：一个对象保存全部字段，带版本号和逐字段的修改记录
+
+原来每个会话在 st.session_state 里散放二十多个键，默认值在初始化和重置里各写一遍，
+重置时还要遍历会话里的所有键。现在默认值只在 DEFAULTS 里写一次：
+
+    state = get_resume_state()
+    state.update("name", st.text_input("姓名", value=state.name, key=state.widget_key("name_input")))
+
+字段值有变化时 version 加一，并记下该字段是在哪个版本改的，预览、PDF 等下游可以据此跳过没变的部分。
+重置只是换一个新对象（generation 加一）：控件键随 generation 变化，旧控件的值由 Streamlit 自动回收，
+不必逐个删除会话里的键。
+"""
+import datetime
+
+import streamlit as st
+
+
+class ResumeState:
+    """一份简历的全部表单字段"""
+
+    DEFAULTS = {
+        "name": "",
+        "nickname": "",
+        "phone": "",
+        "email": "",
+        "address": "",
+        "id_card": "",
+        "birth_date": datetime.date(2000, 1, 1),
+        "gender": "女",
+        "education": "本科",
+        "skills": ["UI/UX设计", "新媒体运营"],
+        "custom_skills": "",
+        "work_exp": 0,
+        "salary_range": (8000, 12000),
+        "grad_info": "2024届 某某大学 某某专业",
+        "grad_info_custom": "",
+        "job_intention": "新媒体运营",
+        "job_intention_custom": "",
+        "job_city": ["北京", "上海"],
+        "custom_city": "",
+        "arrival_time": "随时到岗",
+        "experience": "",
+        "intro": "",
+        "avatar": None,
+    }
+    FIELDS = tuple(DEFAULTS)
+
+    __slots__ = FIELDS + ("generation", "version", "_field_versions")
+
+    def __init__(self, generation=0):
+        for field, value in self.DEFAULTS.items():
+            # 列表默认值每个对象复制一份，避免多个会话共用同一个列表
+            setattr(self, field, list(value) if isinstance(value, list) else value)
+        self.generation = generation  # 第几次重置，控件键以此区分
+        self.version = 0
+        self._field_versions = dict.fromkeys(self.FIELDS, 0)
+
+    def update(self, field, value):
+        """写入一个字段并返回写入的值；值有变化时版本号加一"""
+        if getattr(self, field) != value:
+            setattr(self, field, value)
+            self.version += 1
+            self._field_versions[field] = self.version
+        return value
+
+    def resolved_grad_info(self):
+        return self.grad_info_custom if self.grad_info == "自定义" else self.grad_info
+
+    def resolved_job_intention(self):
+        return self.job_intention_custom if self.job_intention == "自定义" else self.job_intention
+
+    def resolved_job_city(self):
+        """选了"其他"时换成手填的城市"""
+        cities = [city for city in self.job_city if city != "其他"]
+        if self.custom_city and "其他" in self.job_city:
+            cities.append(self.custom_city)
+        return cities
+
+    def field_version(self, *fields):
+        """这些字段最后一次修改时的版本号，可作为下游缓存的键"""
+        return max(self._field_versions[field] for field in fields)
+
+    def changed_since(self, version, *fields):
+        """在 version 之后是否改过这些字段（不传字段时看全部字段）"""
+        return self.field_version(*(fields or self.FIELDS)) > version
+
+    def widget_key(self, key):
+        """控件键：重置后换一组新键，控件回到默认值"""
+        return key if self.generation == 0 else f"{key}_{self.generation}"
+
+    def reset(self):
+        """返回恢复默认值的新对象"""
+        return type(self)(self.generation + 1)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} 已重置{self.generation}次 版本{self.version}>"
+
+
+class PetResumeState(ResumeState):
+    """首页宠物简历：品种和技能换成宠物的选项"""
+
+    DEFAULTS = dict(ResumeState.DEFAULTS, education="金毛", skills=["握手"])
+
+    __slots__ = ()
+
+
+def get_resume_state(key="resume_state", state_class=ResumeState):
+    """取会话中的简历状态对象，没有时创建"""
+    state = st.session_state.get(key)
+    if state is None:
+        state = st.session_state[key] = state_class()
+    return state
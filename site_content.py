@@ -0,0 +1,38 @@
+"""页面的静态内容：首页介绍、剧集列表（含剧情介绍）、歌曲列表、相册图片
+
+内容统一放在 data/site_content.json，整个服务进程只读取一次（st.cache_resource），所有会话共享同一份
+只读对象，会话再多内存也不会随之增长。修改 JSON 文件后，下一次访问时自动重新加载。
+"""
+import json
+import os
+from types import MappingProxyType
+
+import streamlit as st
+
+CONTENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "site_content.json")
+
+
+def _freeze(value):
+    """字典转为只读映射、列表转为元组，防止某个会话改动共享的内容"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@st.cache_resource(show_spinner=False)
+def _load_content(path, mtime_ns):
+    # mtime_ns 只用于区分缓存：文件修改后换一个缓存项
+    with open(path, encoding="utf-8") as f:
+        return _freeze(json.load(f))
+
+
+def content_version():
+    """内容文件的版本标识（修改时间），文件改动后随之变化"""
+    return os.stat(CONTENT_PATH).st_mtime_ns
+
+
+def get_content(name):
+    """按名称取共享的只读内容：home_intro、videos、music、photos"""
+    return _load_content(CONTENT_PATH, content_version())[name]
@@ -0,0 +1,49 @@
+import streamlit as st
+
+from profiling import section as profile_section
+
+
+def keep_widget_state(prefix, skip_prefixes=()):
+    """把未渲染分区的控件值转存为普通会话状态，避免被Streamlit当作过期控件回收"""
+    for key in list(st.session_state.keys()):
+        if not key.startswith(prefix):
+            continue
+        # 文件上传器、按钮等控件的值不允许通过session_state赋值
+        if any(key.startswith(skip) for skip in skip_prefixes):
+            continue
+        st.session_state[key] = st.session_state[key]
+
+
+def run_lazy_tabs(sections, key, default_index=0):
+    """横向分区导航：只执行当前激活分区的代码，其余分区的会话状态原样保留
+
+    sections 为字典列表，每项包含：
+        label: 分区名称
+        render: 渲染该分区的无参函数
+        state_prefix: 该分区会话状态键的前缀（可选）
+        skip_prefixes: 不能回写的控件键前缀（可选）
+    """
+    profile_section("分区导航")
+    labels = [section["label"] for section in sections]
+    active_label = st.radio(
+        "选择分区",
+        labels,
+        index=default_index,
+        horizontal=True,
+        label_visibility="collapsed",
+        key=key
+    )
+
+    for section in sections:
+        if section["label"] == active_label:
+            continue
+        if section.get("state_prefix"):
+            keep_widget_state(section["state_prefix"], section.get("skip_prefixes", ()))
+
+    for section in sections:
+        if section["label"] == active_label:
+            profile_section(f"分区：{active_label}")
+            section["render"]()
+            break
+
+    return active_label
@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import Future
+
+import pytest
+
+import batch_resume
+from batch_resume import RecordError, decode_roster, export_batch_file, read_records
+
+
+class InlineExecutor:
+    """在当前进程里同步执行任务，测试不必启动进程池"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture
+def inline_export(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch_resume, "get_shared_pool", InlineExecutor)
+    monkeypatch.setattr(batch_resume, "get_cache_dir", lambda name: str(tmp_path))
+    monkeypatch.setattr(batch_resume, "_render_record", lambda index, record, avatar_dir=None: (
+        index, f"{index + 1:05d}_{record.get('name') or '简历'}.pdf", b"%PDF-fake", ""
+    ))
+    return tmp_path
+
+
+def zip_names(path):
+    with zipfile.ZipFile(path) as zf:
+        return sorted(zf.namelist())
+
+
+def test_gbk_roster_is_decoded():
+    data = "name,gender\n小美,女\n".encode("gbk")
+    records = list(read_records(io.StringIO(decode_roster(data)), "roster.csv"))
+    assert records == [{"name": "小美", "gender": "女"}]
+
+
+def test_utf8_bom_roster_is_decoded():
+    data = "name\n小美\n".encode("utf-8-sig")
+    assert list(read_records(io.StringIO(decode_roster(data)), "roster.csv")) == [{"name": "小美"}]
+
+
+def test_malformed_jsonl_line_becomes_row_error():
+    stream = io.StringIO('{"name": "甲"}\n{"name": \n\n[1, 2]\n{"name": "乙"}\n')
+    records = list(read_records(stream, "roster.jsonl"))
+    assert records[0] == {"name": "甲"}
+    assert isinstance(records[1], RecordError)
+    assert isinstance(records[2], RecordError)
+    assert records[3] == {"name": "乙"}
+
+
+def test_export_reports_bad_lines_and_keeps_good_ones(inline_export):
+    data = '{"name": "甲"}\nnot json\n{"name": "乙"}\n'.encode("utf-8")
+    path, done_count, errors = export_batch_file(data, "roster.jsonl")
+    try:
+        assert done_count == 2
+        assert [row for row, _ in errors] == [2]
+        assert zip_names(path) == ["00001_甲.pdf", "00003_乙.pdf", "errors.txt"]
+    finally:
+        os.remove(path)
+
+
+def test_export_stops_at_record_cap(inline_export, monkeypatch):
+    monkeypatch.setattr(batch_resume, "MAX_WEB_RECORDS", 3)
+    data = "".join(json.dumps({"name": f"人{i}"}) + "\n" for i in range(5)).encode("utf-8")
+    path, done_count, errors = export_batch_file(data, "roster.jsonl")
+    try:
+        assert done_count == 3
+        assert errors == [(4, "名单超过3条，从这一条起未导出")]
+    finally:
+        os.remove(path)
+
+
+def test_undecodable_roster_leaves_no_temp_file(inline_export):
+    with pytest.raises(ValueError):
+        export_batch_file(b"\xff\xfe\xfa\x00\x81", "roster.csv")
+    assert os.listdir(inline_export) == []
@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+import export_jobs
+from export_jobs import DONE, ExportQueue, ExportQueueFull
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """导出在 gate 打开之前一直阻塞，用来制造排队和生成中的任务"""
+    event = threading.Event()
+
+    def fake_pdf(fields, avatar_bytes=None, **kwargs):
+        event.wait(5)
+        return b"%PDF"
+
+    monkeypatch.setattr(export_jobs, "get_resume_pdf", fake_pdf)
+    yield event
+    event.set()
+
+
+def test_full_queue_of_live_jobs_rejects_new_submits(gate):
+    queue = ExportQueue(max_workers=1, max_jobs=2)
+    running, queued = queue.submit({}), queue.submit({})
+    with pytest.raises(ExportQueueFull):
+        queue.submit({})
+    # 已有的任务都没有被淘汰或取消
+    assert queue.get(running.job_id) is running
+    assert queue.get(queued.job_id) is queued
+    gate.set()
+    queued.future.result(timeout=5)
+    assert (running.status, queued.status) == (DONE, DONE)
+
+
+def test_only_finished_jobs_are_evicted(gate):
+    queue = ExportQueue(max_workers=1, max_jobs=2)
+    gate.set()
+    finished = queue.submit({})
+    finished.future.result(timeout=5)
+    gate.clear()
+    live = queue.submit({})
+    newest = queue.submit({})  # 满了：淘汰已完成的那个
+    assert queue.get(finished.job_id) is None
+    assert queue.get(live.job_id) is live
+    assert queue.get(newest.job_id) is newest
+    assert not live.future.cancelled()
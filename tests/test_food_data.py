@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+import food_data
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """JSON 数据源复制到临时目录；随项目发布的数据目录不存在，数据都生成到临时目录"""
+    json_path = tmp_path / "nanning_food.json"
+    with open(food_data.FOOD_DATA_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    json_path.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(food_data, "FOOD_DATA_PATH", str(json_path))
+    monkeypatch.setattr(food_data, "FOOD_STORE_DIR", str(tmp_path / "shipped"))
+    monkeypatch.setattr(food_data, "GENERATED_STORE_DIR", str(tmp_path / "generated"))
+    return raw
+
+
+def test_restaurants_keep_source_order(store):
+    df = food_data.query_restaurants()["restaurants"]
+    assert df["餐厅"].tolist() == store["restaurants"]["餐厅"]
+
+
+def test_price_trend_keeps_source_column_order(store):
+    names = food_data.query_restaurants()["restaurants"]["餐厅"].head(5).tolist()
+    trend = food_data.load_price_trend(names)
+    expected = [name for name in store["price_trend"] if name != "月份"]
+    assert trend.columns.tolist() == expected
+    assert trend.index.tolist() == store["price_trend"]["月份"]
+    assert trend["兰州拉面"].tolist() == store["price_trend"]["兰州拉面"]
+
+
+def test_filters_and_projection(store):
+    query = food_data.query_restaurants(types=("快餐",), price_range=(10, 20))
+    df = query["restaurants"]
+    assert df["餐厅"].tolist() == ["塔斯汀", "三品王"]
+    assert df.columns.tolist() == food_data.QUERY_COLUMNS  # 详情列不随筛选结果读取
+    assert "spatial_index" not in query  # 地图索引第一次取用时才建立
+    assert len(query["spatial_index"]) == 2
+    assert query["spatial_index"] is query["spatial_index"]
+
+
+def test_restaurant_detail_reads_all_columns(store):
+    row = food_data.get_restaurant("兰州拉面")
+    assert list(row["推荐菜品"]) == ["牛肉拉面", "清汤拉面", "炒拉面"]
+    assert row["拥挤程度(%)"] == 85
+    with pytest.raises(KeyError):
+        food_data.get_restaurant("不存在的餐厅")
+
+
+def test_partial_store_is_rebuilt(store):
+    store_dir = food_data.get_store_dir()
+    os.remove(food_data._table_path(store_dir, "time_data"))
+    assert food_data.get_store_dir() == store_dir
+    assert food_data._store_complete(store_dir)
+
+
+def test_partial_shipped_store_is_ignored(store):
+    shipped = food_data.FOOD_STORE_DIR
+    food_data.build_store_from_json(food_data.FOOD_DATA_PATH, shipped)
+    assert food_data.get_store_dir() == shipped
+    os.remove(food_data._table_path(shipped, "price_trend"))
+    assert food_data.get_store_dir() == food_data.GENERATED_STORE_DIR
@@ -0,0 +1,149 @@
+import os
+import threading
+
+import pytest
+from PIL import Image, ImageDraw
+
+import gallery_index
+from gallery_index import GalleryIndex, PathBatcher
+from photo_dedup import PhotoDedupIndex
+
+
+def save_photo(path, size=(320, 240), seed=0, quality=90):
+    """画几个色块的测试照片；seed 不同时图案不同"""
+    img = Image.new("RGB", size, (240, 240, 240))
+    draw = ImageDraw.Draw(img)
+    for i in range(4):
+        x = (seed * 37 + i * 71) % (size[0] - 60)
+        y = (seed * 53 + i * 29) % (size[1] - 60)
+        draw.rectangle([x, y, x + 60, y + 60], fill=((seed * 90 + i * 60) % 256, 40 * i, 200 - 40 * i))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    img.save(path, quality=quality)
+
+
+@pytest.fixture
+def make_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(gallery_index, "get_cache_dir", lambda name: str(tmp_path / "cache" / name))
+    os.makedirs(tmp_path / "cache" / "gallery" / "thumbs")
+    root = tmp_path / "gallery"
+    root.mkdir()
+
+    def make(dedup=True):
+        return GalleryIndex(
+            root=str(root),
+            db_path=str(tmp_path / "gallery.sqlite"),
+            dedup=PhotoDedupIndex(db_path=str(tmp_path / "assets.sqlite")) if dedup else None
+        )
+    return root, make
+
+
+def rows_by_path(index):
+    return {row["path"]: row for row in index.page(page_size=100)}
+
+
+def test_near_duplicate_reuses_thumbnail(make_index):
+    root, make = make_index
+    save_photo(str(root / "a.jpg"), seed=1)
+    save_photo(str(root / "b.jpg"), seed=2)
+    index = make()
+    index.scan()
+
+    # 同一张照片缩小、重新压缩后放进图库：沿用 a.jpg 的缩略图
+    with Image.open(root / "a.jpg") as img:
+        img.resize((160, 120)).save(root / "a_small.jpg", quality=60)
+    index.update_paths([str(root / "a_small.jpg")])
+    rows = rows_by_path(index)
+    assert rows["a_small.jpg"]["sha1"] != rows["a.jpg"]["sha1"]
+    assert rows["a_small.jpg"]["thumb_key"] == rows["a.jpg"]["thumb_key"] == rows["a.jpg"]["sha1"]
+    assert rows["b.jpg"]["thumb_key"] == rows["b.jpg"]["sha1"]
+    assert index.thumbnail(rows["a_small.jpg"]) == index.thumbnail(rows["a.jpg"])
+
+
+def test_near_duplicates_in_one_scan_share_thumbnail(make_index):
+    root, make = make_index
+    save_photo(str(root / "a.jpg"), seed=3)
+    save_photo(str(root / "copy" / "a.jpg"), seed=3, quality=70)
+    index = make()
+    index.scan()
+    rows = rows_by_path(index)
+    assert rows["a.jpg"]["thumb_key"] == rows["copy/a.jpg"]["thumb_key"]
+
+
+def test_without_dedup_thumbnail_key_is_content_hash(make_index):
+    root, make = make_index
+    save_photo(str(root / "a.jpg"), seed=4)
+    save_photo(str(root / "a2.jpg"), seed=4, quality=70)
+    index = make(dedup=False)
+    index.scan()
+    for row in rows_by_path(index).values():
+        assert row["thumb_key"] == row["sha1"]
+
+
+def test_incremental_scan_reads_only_changed_files(make_index, monkeypatch):
+    root, make = make_index
+    for name, seed in (("a.jpg", 5), ("b.jpg", 6), ("sub/c.jpg", 7)):
+        save_photo(str(root / name), seed=seed)
+    index = make(dedup=False)
+    assert index.scan() == (3, 0)
+
+    described = []
+    describe = index._describe
+    monkeypatch.setattr(index, "_describe", lambda rel, *args: described.append(rel) or describe(rel, *args))
+    assert index.scan() == (0, 0)  # 没有改动时一个文件都不读
+    assert described == []
+
+    save_photo(str(root / "d.jpg"), seed=8)  # 新增
+    save_photo(str(root / "a.jpg"), size=(400, 300), seed=9)  # 修改
+    os.remove(root / "sub" / "c.jpg")  # 删除
+    assert index.scan() == (2, 1)
+    assert sorted(described) == ["a.jpg", "d.jpg"]
+    rows = rows_by_path(index)
+    assert sorted(rows) == ["a.jpg", "b.jpg", "d.jpg"]
+    assert (rows["a.jpg"]["width"], rows["a.jpg"]["height"]) == (400, 300)
+
+
+def test_update_paths_adds_modifies_and_deletes(make_index):
+    root, make = make_index
+    save_photo(str(root / "a.jpg"), seed=10)
+    index = make(dedup=False)
+    index.scan()
+
+    save_photo(str(root / "b.jpg"), seed=11)
+    save_photo(str(root / "a.jpg"), size=(200, 100), seed=12)
+    index.update_paths([str(root / "a.jpg"), str(root / "b.jpg"), str(root / "notes.txt")])
+    rows = rows_by_path(index)
+    assert sorted(rows) == ["a.jpg", "b.jpg"]
+    assert rows["a.jpg"]["width"] == 200
+
+    os.remove(root / "a.jpg")
+    index.update_paths([str(root / "a.jpg")])
+    assert sorted(rows_by_path(index)) == ["b.jpg"]
+
+
+def test_pages_follow_path_order(make_index):
+    root, make = make_index
+    names = [f"p{i:02d}.png" for i in range(7)]
+    for i, name in enumerate(names):
+        save_photo(str(root / name), size=(80, 80), seed=i)
+    index = make(dedup=False)
+    index.scan()
+
+    starts = index.page_starts(3)
+    assert starts == ["p00.png", "p03.png", "p06.png"]
+    assert [[row["path"] for row in index.page(start, 3)] for start in starts] == [names[0:3], names[3:6], names[6:]]
+
+    # 写入后页首重新计算
+    os.remove(root / "p01.png")
+    index.scan()
+    assert index.page_starts(3) == ["p00.png", "p04.png"]
+
+
+def test_path_batcher_merges_bursts():
+    batches = []
+    done = threading.Event()
+    batcher = PathBatcher(lambda paths: (batches.append(paths), done.set()), delay=0.2)
+    for _ in range(5):  # 连续的 modified 事件
+        batcher.add(["a.jpg"])
+    batcher.add(["b.jpg", "a.jpg"])
+    assert done.wait(5)
+    assert batches == [["a.jpg", "b.jpg"]]
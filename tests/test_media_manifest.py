@@ -0,0 +1,115 @@
+import re
+
+import pytest
+
+from http_helpers import QuietHandler
+from media_manifest import HEAD_BYTES, MediaManifest
+
+
+def box(box_type, payload):
+    return (8 + len(payload)).to_bytes(4, "big") + box_type.encode("latin-1") + payload
+
+
+def make_mp4(moov_at_end=False, mdat_size=HEAD_BYTES * 2):
+    """最小的 MP4：一个 320x240 的 H.264 视频轨、一个 AAC 音频轨，时长 125.5 秒"""
+    mvhd = box("mvhd", bytes(12) + (1000).to_bytes(4, "big") + (125500).to_bytes(4, "big") + bytes(80))
+
+    def trak(handler, codec, sample_entry):
+        hdlr = box("hdlr", bytes(8) + handler.encode("latin-1") + bytes(12))
+        stsd = box("stsd", bytes(4) + (1).to_bytes(4, "big") + box(codec, sample_entry))
+        return box("trak", box("mdia", hdlr + box("minf", box("stbl", stsd))))
+
+    video_entry = bytes(24) + (320).to_bytes(2, "big") + (240).to_bytes(2, "big") + bytes(50)
+    moov = box("moov", mvhd + trak("vide", "avc1", video_entry) + trak("soun", "mp4a", bytes(28)))
+    ftyp = box("ftyp", b"isom" + bytes(4) + b"isomavc1")
+    mdat = box("mdat", bytes(mdat_size))
+    return ftyp + (mdat + moov if moov_at_end else moov + mdat)
+
+
+class VideoHandler(QuietHandler):
+    """/head.mp4 moov 在文件头；/tail.mp4 moov 在文件尾；ignore_range 为 True 时总是返回整个文件"""
+
+    files = {"/head.mp4": make_mp4(), "/tail.mp4": make_mp4(moov_at_end=True)}
+    ignore_range = False
+    ranges_seen = []
+
+    def do_GET(self):
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_body(404, b"not found", "text/plain")
+            return
+        match = re.match(r"bytes=(\d+)-(\d+)$", self.headers.get("Range", ""))
+        if match is None or self.ignore_range:
+            self.send_body(200, data, "video/mp4")
+            return
+        start, end = int(match.group(1)), min(int(match.group(2)), len(data) - 1)
+        self.ranges_seen.append((start, end))
+        self.send_body(206, data[start:end + 1], "video/mp4", {
+            "Content-Range": f"bytes {start}-{end}/{len(data)}", "Accept-Ranges": "bytes"
+        })
+
+
+@pytest.fixture
+def video_server(http_server):
+    VideoHandler.ignore_range = False
+    VideoHandler.ranges_seen = []
+    yield http_server(VideoHandler)
+    VideoHandler.ignore_range = False
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return MediaManifest(path=str(tmp_path / "manifest.json"), max_workers=2)
+
+
+def assert_full_metadata(meta, size):
+    assert meta["available"] is True
+    assert meta["accepts_ranges"] is True
+    assert meta["size"] == size
+    assert meta["duration"] == 125.5
+    assert (meta["video_codec"], meta["audio_codec"]) == ("avc1", "mp4a")
+    assert (meta["width"], meta["height"]) == (320, 240)
+
+
+def test_moov_at_head_needs_one_request(video_server, manifest):
+    meta = manifest.probe(f"{video_server}/head.mp4")
+    assert_full_metadata(meta, len(VideoHandler.files["/head.mp4"]))
+    assert VideoHandler.ranges_seen == [(0, HEAD_BYTES - 1)]
+
+
+def test_moov_at_tail_is_fetched_with_ranges(video_server, manifest):
+    data = VideoHandler.files["/tail.mp4"]
+    meta = manifest.probe(f"{video_server}/tail.mp4")
+    assert_full_metadata(meta, len(data))
+    # 没有下载 mdat：读了文件头、mdat 之后的 box 头和 moov 本身
+    assert sum(end - start + 1 for start, end in VideoHandler.ranges_seen) < HEAD_BYTES + 1024
+
+
+def test_server_ignoring_range(video_server, manifest):
+    VideoHandler.ignore_range = True
+    meta = manifest.probe(f"{video_server}/head.mp4")
+    assert meta["available"] is True
+    assert meta["accepts_ranges"] is False
+    assert meta["duration"] == 125.5  # moov 在文件头，读到的前一段已经够用
+
+    meta = manifest.probe(f"{video_server}/tail.mp4")
+    assert meta["available"] is True
+    assert meta["accepts_ranges"] is False
+    assert meta.get("duration") is None  # 不支持 Range 时不为了 moov 下载整个文件
+
+
+def test_missing_file(video_server, manifest):
+    meta = manifest.probe(f"{video_server}/missing.mp4")
+    assert meta["available"] is False
+    assert "404" in meta["error"]
+
+
+def test_get_is_non_blocking_and_persisted(video_server, manifest, tmp_path):
+    url = f"{video_server}/head.mp4"
+    assert manifest.get(url) is None  # 第一次只在后台开始探测
+    assert manifest.wait(url, timeout=5)["duration"] == 125.5
+    # 结果写入磁盘，新进程（新实例）直接读取，不再请求
+    VideoHandler.ranges_seen = []
+    reloaded = MediaManifest(path=str(tmp_path / "manifest.json"))
+    assert reloaded.get(url)["duration"] == 125.5
+    assert VideoHandler.ranges_seen == []
@@ -0,0 +1,126 @@
+import http.client
+
+import pytest
+
+from media_server import parse_range, run_media_server
+
+FILE_NAME = "0123456789abcdef0123456789abcdef01234567.mp4"
+DATA = bytes(range(256)) * 4096  # 1 MiB，大于一次 sendfile 通常能写完的量
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),  # 终点超出文件时截到末尾
+    ("bytes=-100", (900, 999)),  # 后缀：最后100字节
+    ("bytes=-5000", (0, 999)),
+    ("bytes=0-1,5-6", None),  # 多段不支持：返回整个文件
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5-4", "bytes=-0", "bytes=-"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("media")
+    (cache_dir / FILE_NAME).write_bytes(DATA)
+    port = run_media_server(str(cache_dir), 0)
+    assert port is not None
+    return port
+
+
+@pytest.fixture
+def conn(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server, timeout=5)
+    yield conn
+    conn.close()
+
+
+def request(conn, method="GET", headers=None, name=FILE_NAME):
+    conn.request(method, f"/media/{name}", headers=headers or {})
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_full_file(conn):
+    response, body = request(conn)
+    assert response.status == 200
+    assert body == DATA
+    assert response.getheader("Accept-Ranges") == "bytes"
+    assert response.getheader("Content-Type") == "video/mp4"
+
+
+def test_range(conn):
+    response, body = request(conn, headers={"Range": "bytes=100-199"})
+    assert response.status == 206
+    assert body == DATA[100:200]
+    assert response.getheader("Content-Range") == f"bytes 100-199/{len(DATA)}"
+
+
+def test_suffix_range(conn):
+    response, body = request(conn, headers={"Range": "bytes=-10"})
+    assert response.status == 206
+    assert body == DATA[-10:]
+
+
+def test_unsatisfiable_range(conn):
+    response, body = request(conn, headers={"Range": f"bytes={len(DATA)}-"})
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(DATA)}"
+    assert body == b""
+
+
+def test_etag_not_modified(conn):
+    response, _ = request(conn, "HEAD")
+    etag = response.getheader("ETag")
+    response, body = request(conn, headers={"If-None-Match": etag})
+    assert response.status == 304
+    assert body == b""
+
+
+def test_if_range_mismatch_returns_full_file(conn):
+    response, body = request(conn, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status == 200
+    assert body == DATA
+
+
+def test_head_has_length_but_no_body(conn):
+    response, body = request(conn, "HEAD", headers={"Range": "bytes=0-99"})
+    assert response.status == 206
+    assert response.getheader("Content-Length") == "100"
+    assert body == b""
+
+
+def test_rejects_unknown_names(conn):
+    response, _ = request(conn, name="../secret.mp4")
+    assert response.status == 404
+    response, _ = request(conn, name="f" * 40 + ".mp4")
+    assert response.status == 404
+
+
+def test_connection_is_kept_alive(conn):
+    response, body = request(conn)
+    assert body == DATA
+    assert (response.getheader("Connection") or "").lower() != "close"
+    sock = conn.sock
+    assert sock is not None
+    # 同一连接上继续请求（包括 sendfile 发送的整文件和 Range 请求）
+    for headers in ({"Range": "bytes=0-9"}, {}, {"Range": "bytes=-5"}):
+        response, body = request(conn, headers=headers)
+        assert response.status in (200, 206)
+        assert conn.sock is sock
+
+
+def test_client_asking_to_close_is_closed(conn):
+    response, body = request(conn, headers={"Connection": "close"})
+    assert body == DATA
+    assert conn.sock is None
@@ -0,0 +1,93 @@
+import json
+import os
+import random
+
+import pytest
+from streamlit.runtime.pages_manager import PagesManager
+from streamlit.testing.v1 import AppTest
+
+import music_library
+from music_library import MusicLibrary, ShuffleOrder, load_music_library
+
+MUSIC_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "music.py")
+TRACKS = [
+    {"cover_url": "", "title": f"歌{i}", "artist": "歌手", "duration": "3:05", "audio_url": f"https://example.com/{i}.mp3"}
+    for i in range(5)
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 50])
+def test_shuffle_plays_every_song_once_per_cycle(size):
+    order = ShuffleOrder(size, rng=random.Random(size))
+    current = None
+    for _ in range(5):
+        cycle = []
+        for _ in range(size):
+            current = order.next(current)
+            cycle.append(current)
+        assert sorted(cycle) == list(range(size))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_new_cycle_does_not_start_with_last_song(seed):
+    size = 4
+    order = ShuffleOrder(size, rng=random.Random(seed))
+    current = None
+    for _ in range(size * 10):
+        previous, current = current, order.next(current)
+        assert current != previous
+
+
+def test_empty_shuffle():
+    assert ShuffleOrder(0).next() is None
+
+
+def test_library_pages_and_durations():
+    library = MusicLibrary(TRACKS * 5)
+    assert library.page_count(page_size=10) == 3
+    assert [idx for idx, _ in library.page(2, page_size=10)] == list(range(20, 25))
+    assert library[0]["seconds"] == 185
+    assert library.index_of("https://example.com/3.mp3") == 23  # 重复的链接取最后一首
+
+
+@pytest.fixture
+def fresh_libraries(tmp_path, monkeypatch):
+    monkeypatch.setattr(music_library, "_libraries", {})
+    monkeypatch.setattr(music_library, "get_cache_dir", lambda name: str(tmp_path / "cache"))
+    os.makedirs(tmp_path / "cache")
+    return music_library._libraries
+
+
+def test_only_latest_file_library_is_kept(tmp_path, fresh_libraries):
+    path = tmp_path / "library.json"
+    path.write_text(json.dumps(TRACKS[:2], ensure_ascii=False), encoding="utf-8")
+    first = load_music_library([], str(path))
+    assert load_music_library([], str(path)) is first
+    path.write_text(json.dumps(TRACKS, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, ns=(1, 10 ** 18))  # 确保修改时间不同
+    second = load_music_library([], str(path))
+    assert len(second) == 5
+    assert len(fresh_libraries) == 1
+
+
+def test_only_latest_builtin_library_is_kept(tmp_path, fresh_libraries):
+    missing = str(tmp_path / "missing.json")
+    load_music_library(TRACKS[:2], missing, default_version="v1")
+    latest = load_music_library(TRACKS, missing, default_version="v2")
+    assert len(latest) == 5
+    assert list(fresh_libraries) == [("builtin", "v2")]
+
+
+def test_player_switches_songs(monkeypatch):
+    # music.py 旁边有 pages/ 目录，Streamlit 会把这个判断缓存在类属性上，测试结束后还原
+    monkeypatch.setattr(PagesManager, "uses_pages_directory", None)
+    at = AppTest.from_file(MUSIC_PAGE, default_timeout=30).run()
+    assert not at.exception
+    first_title = at.subheader[0].value
+    next_button = next(button for button in at.button if button.label == "▶▶ 下一首")
+    at = next_button.click().run()
+    assert not at.exception
+    assert at.subheader[0].value != first_title
+    assert at.session_state.current_music_idx == 1
+    playing = [item.value for item in at.markdown if "正在播放" in item.value]
+    assert len(playing) == 1 and playing[0].startswith("2.")
@@ -0,0 +1,40 @@
+from resume_pdf import PdfRenderCache
+
+
+def test_evicts_least_recently_used_by_total_bytes():
+    cache = PdfRenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"  # a 变为最近使用
+    cache.put("c", b"1234")  # 超出10字节：淘汰最久未用的 b
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
+    assert (len(cache), cache.total_bytes) == (2, 8)
+
+
+def test_replacing_a_key_updates_size_accounting():
+    cache = PdfRenderCache(max_bytes=10)
+    cache.put("a", b"123456")
+    cache.put("a", b"12")
+    assert (len(cache), cache.total_bytes) == (1, 2)
+    cache.put("b", b"12345678")
+    assert cache.get("a") == b"12"
+    assert cache.total_bytes == 10
+
+
+def test_oversize_entry_is_not_cached():
+    cache = PdfRenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("big", b"x" * 11)
+    assert cache.get("big") is None
+    assert cache.get("a") == b"1234"  # 其他内容不会因此被挤掉
+    assert cache.total_bytes == 4
+
+
+def test_oversize_replacement_drops_the_stale_entry():
+    cache = PdfRenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("a", b"x" * 11)
+    assert cache.get("a") is None
+    assert (len(cache), cache.total_bytes) == (0, 0)
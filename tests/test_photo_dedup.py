@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from photo_dedup import BKTree, PhotoDedupIndex, hamming
+
+
+def flip_bits(value, count, rng):
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+@pytest.fixture
+def hashes():
+    """一批随机哈希，另外在几个中心附近各放一些近似的哈希"""
+    rng = random.Random(16)
+    values = [rng.getrandbits(64) for _ in range(2000)]
+    for center in values[:20]:
+        values.extend(flip_bits(center, rng.randint(1, 8), rng) for _ in range(10))
+    return values
+
+
+@pytest.mark.parametrize("max_distance", [0, 3, 5, 10])
+def test_search_matches_brute_force(hashes, max_distance):
+    tree = BKTree()
+    for item, value in enumerate(hashes):
+        tree.add(value, item)
+    assert len(tree) == len(hashes)
+    for query in hashes[:20] + [0, (1 << 64) - 1]:
+        expected = sorted((hamming(query, value), item) for item, value in enumerate(hashes)
+                          if hamming(query, value) <= max_distance)
+        found = tree.search(query, max_distance)
+        assert sorted(found) == expected
+        assert [distance for distance, _ in found] == sorted(distance for distance, _ in found)
+
+
+def test_duplicate_hashes_share_a_node():
+    tree = BKTree()
+    tree.add(42, "a")
+    tree.add(42, "b")
+    assert sorted(tree.search(42, 0)) == [(0, "a"), (0, "b")]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return PhotoDedupIndex(db_path=str(tmp_path / "assets.sqlite"))
+
+
+def test_find_skips_removed_assets(index):
+    near = 0b1011 << 20
+    index.add("gallery:a.jpg", (near, near), "gallery", "a.jpg")
+    index.add("gallery:b.jpg", (near ^ 0b111, near ^ 0b111), "gallery", "b.jpg")
+    best, _ = index.find(hashes=(near, near))
+    assert best["key"] == "gallery:a.jpg" and best["distance"] == 0
+
+    index.remove(["gallery:a.jpg"])
+    best, _ = index.find(hashes=(near, near))
+    assert best["key"] == "gallery:b.jpg" and best["distance"] == 3
+
+    index.remove(["gallery:b.jpg"])
+    assert index.find(hashes=(near, near))[0] is None
+
+
+def test_find_uses_current_hashes_after_update(index):
+    old, new = 0, (1 << 64) - 1
+    index.add("gallery:a.jpg", (old, old), "gallery", "a.jpg")
+    index.add("gallery:a.jpg", (new, new), "gallery", "a.jpg")
+    # 旧哈希的节点还在树里，但记录已经换成新哈希，不应再被旧哈希找到
+    assert index.find(hashes=(old, old))[0] is None
+    assert index.find(hashes=(new, new))[0]["key"] == "gallery:a.jpg"
+
+
+def test_index_is_reloaded_from_disk(index, tmp_path):
+    index.add("gallery:a.jpg", (7, 7), "gallery", "a.jpg")
+    index.remove(["gallery:missing.jpg"])
+    reloaded = PhotoDedupIndex(db_path=str(tmp_path / "assets.sqlite"))
+    assert len(reloaded) == 1
+    assert reloaded.find(hashes=(7, 7))[0]["path"] == "a.jpg"
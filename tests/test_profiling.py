@@ -0,0 +1,56 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import app_cache
+import profiling
+
+
+def profiled_page():
+    from profiling import render_profile_panel, section, start_profiling
+
+    start_profiling("测试页")
+    section("第一段")
+    section("第二段")
+    render_profile_panel()
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_cache, "get_cache_dir", lambda name: str(tmp_path))
+    return tmp_path
+
+
+def run_page(mode):
+    at = AppTest.from_function(profiled_page)
+    at.query_params["profile"] = mode
+    return at.run()
+
+
+def test_query_parameter_is_ignored_unless_enabled(monkeypatch, profile_dir):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+    at = run_page("cprofile")
+    assert not at.exception
+    assert len(at.sidebar.dataframe) == 0
+    assert os.listdir(profile_dir) == []
+
+
+def test_timing_table_when_enabled(monkeypatch, profile_dir):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    at = run_page("1")
+    assert not at.exception
+    table = at.sidebar.dataframe[0].value
+    assert [name.strip() for name in table["段落"]] == ["第一段", "第二段"]
+    assert os.listdir(profile_dir) == []  # 只有 ?profile=cprofile 才写文件
+
+
+def test_cprofile_keeps_latest_dumps_without_showing_paths(monkeypatch, profile_dir):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "MAX_PROFILE_DUMPS", 2)
+    for _ in range(3):
+        at = run_page("cprofile")
+        assert not at.exception
+    assert len([name for name in os.listdir(profile_dir) if name.endswith(".pstats")]) == 2
+    captions = " ".join(caption.value for caption in at.sidebar.caption)
+    assert str(profile_dir) not in captions
@@ -0,0 +1,73 @@
+import pytest
+
+import resume_preview
+from resume_preview import SECTIONS, section_html
+from resume_state import ResumeState
+
+
+@pytest.fixture
+def build_counts(monkeypatch):
+    """记录每个分区实际生成HTML的次数"""
+    counts = dict.fromkeys(SECTIONS, 0)
+    for name, (fields, build) in list(SECTIONS.items()):
+        def counting(state, name=name, build=build):
+            counts[name] += 1
+            return build(state)
+        monkeypatch.setitem(SECTIONS, name, (fields, counting))
+    return counts
+
+
+def render_all(state, cache):
+    return {name: section_html(state, name, cache) for name in SECTIONS}
+
+
+def test_unchanged_sections_are_reused(build_counts):
+    state, cache = ResumeState(), {}
+    first = render_all(state, cache)
+    assert set(build_counts.values()) == {1}
+    assert render_all(state, cache) == first
+    assert set(build_counts.values()) == {1}
+
+
+def test_only_the_section_with_the_changed_field_is_rebuilt(build_counts):
+    state, cache = ResumeState(), {}
+    render_all(state, cache)
+    state.update("name", "小桃")
+    html = render_all(state, cache)
+    assert "小桃" in html["header"]
+    assert build_counts == dict(dict.fromkeys(SECTIONS, 1), header=2)
+
+    state.update("custom_city", "苏州")  # 意向分区的字段
+    render_all(state, cache)
+    assert build_counts["intention"] == 2
+    assert build_counts["header"] == 2
+
+
+def test_setting_the_same_value_does_not_invalidate(build_counts):
+    state, cache = ResumeState(), {}
+    render_all(state, cache)
+    state.update("phone", "")
+    render_all(state, cache)
+    assert build_counts["contact"] == 1
+
+
+def test_reset_invalidates_every_section(build_counts):
+    state, cache = ResumeState(), {}
+    render_all(state, cache)
+    render_all(state.reset(), cache)  # 新对象的版本号从0重新开始，靠 generation 区分
+    assert set(build_counts.values()) == {2}
+
+
+def test_experience_lines_and_escaping():
+    state = ResumeState()
+    state.update("experience", "2023 <b>公司</b>\n\n  2022 学校  \n")
+    html = section_html(state, "experience", {})
+    assert html.count("experience-card") == 2
+    assert "&lt;b&gt;公司&lt;/b&gt;" in html
+    assert "2022 学校</div>" in html
+
+
+def test_empty_sections_use_placeholders():
+    html = section_html(ResumeState(), "experience", {})
+    assert html == "<p>暂未填写个人经历，快去左侧补充吧～</p>"
+    assert resume_preview.AVATAR_PLACEHOLDER.startswith("https://")
@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+
+from resume_state import PetResumeState, ResumeState
+
+
+def test_defaults_and_fresh_lists():
+    a, b = ResumeState(), ResumeState()
+    assert a.birth_date == datetime.date(2000, 1, 1)
+    assert a.skills == ["UI/UX设计", "新媒体运营"]
+    a.skills.append("Python")
+    assert b.skills == ["UI/UX设计", "新媒体运营"]  # 列表默认值不在对象之间共享
+    assert ResumeState.DEFAULTS["skills"] == ["UI/UX设计", "新媒体运营"]
+
+
+def test_slots_reject_unknown_fields():
+    with pytest.raises(AttributeError):
+        ResumeState().unknown = 1
+
+
+def test_update_bumps_versions_only_on_change():
+    state = ResumeState()
+    assert state.update("name", "") == ""
+    assert state.version == 0
+    state.update("name", "小桃")
+    state.update("phone", "123")
+    assert state.version == 2
+    assert state.field_version("name") == 1
+    assert state.field_version("phone") == 2
+    assert state.field_version("name", "email") == 1
+    assert state.field_version("email") == 0
+    state.update("name", "小桃")  # 值没变
+    assert state.version == 2
+
+
+def test_changed_since():
+    state = ResumeState()
+    state.update("name", "小桃")
+    seen = state.version
+    state.update("intro", "你好")
+    assert state.changed_since(seen, "intro")
+    assert not state.changed_since(seen, "name", "phone")
+    assert state.changed_since(seen)
+
+
+def test_reset_returns_fresh_generation():
+    state = ResumeState()
+    state.update("name", "小桃")
+    fresh = state.reset()
+    assert (fresh.generation, fresh.version, fresh.name) == (1, 0, "")
+    assert state.widget_key("name_input") == "name_input"
+    assert fresh.widget_key("name_input") == "name_input_1"
+
+
+def test_pet_defaults_override():
+    pet = PetResumeState()
+    assert (pet.education, pet.skills) == ("金毛", ["握手"])
+    assert pet.gender == ResumeState.DEFAULTS["gender"]
+    assert type(pet.reset()) is PetResumeState
+    assert ResumeState().education == "本科"
+
+
+def test_resolved_fields():
+    state = ResumeState()
+    state.update("job_city", ["北京", "其他"])
+    state.update("custom_city", "苏州")
+    state.update("grad_info", "自定义")
+    state.update("grad_info_custom", "2024届 北师大")
+    assert state.resolved_job_city() == ["北京", "苏州"]
+    assert state.resolved_grad_info() == "2024届 北师大"
+    assert state.resolved_job_intention() == "新媒体运营"
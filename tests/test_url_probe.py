@@ -0,0 +1,95 @@
+import time
+
+from http_helpers import QuietHandler
+from url_probe import UrlProbe
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+class ImageHandler(QuietHandler):
+    """/no-head.png 拒绝 HEAD（只能 GET）；/old.png 重定向到 /new.png；/slow.png 迟迟不响应"""
+
+    requests_seen = []
+
+    def do_HEAD(self):
+        self.requests_seen.append(("HEAD", self.path))
+        self._respond()
+
+    def do_GET(self):
+        self.requests_seen.append(("GET", self.path, self.headers.get("Range")))
+        self._respond()
+
+    def _respond(self):
+        if self.path == "/no-head.png" and self.command == "HEAD":
+            self.send_body(405, b"", headers={"Allow": "GET"})
+        elif self.path == "/no-head.png":
+            self.send_body(206, PNG_BYTES[:1], "image/png", {"Content-Range": f"bytes 0-0/{len(PNG_BYTES)}"})
+        elif self.path == "/old.png":
+            self.send_body(302, b"", headers={"Location": "/new.png"})
+        elif self.path == "/new.png":
+            self.send_body(200, PNG_BYTES, "image/png")
+        elif self.path == "/slow.png":
+            time.sleep(1)
+            self.send_body(200, PNG_BYTES, "image/png")
+        else:
+            self.send_body(404, b"not found", "text/plain")
+
+
+def make_probe(**kwargs):
+    return UrlProbe(max_workers=2, **kwargs)
+
+
+def test_head_rejected_falls_back_to_ranged_get(http_server):
+    base = http_server(ImageHandler)
+    ImageHandler.requests_seen = []
+    assert make_probe().check(f"{base}/no-head.png") is True
+    assert ("HEAD", "/no-head.png") in ImageHandler.requests_seen
+    assert ("GET", "/no-head.png", "bytes=0-0") in ImageHandler.requests_seen
+
+
+def test_redirect_is_followed(http_server):
+    base = http_server(ImageHandler)
+    assert make_probe().check(f"{base}/old.png") is True
+
+
+def test_missing_image_is_unavailable(http_server):
+    base = http_server(ImageHandler)
+    assert make_probe().check(f"{base}/missing.png") is False
+
+
+def test_timeout_counts_as_unavailable(http_server):
+    base = http_server(ImageHandler)
+    started = time.monotonic()
+    assert make_probe(timeout=0.2).check(f"{base}/slow.png") is False
+    assert time.monotonic() - started < 1
+
+
+def test_status_never_waits_and_caches_result(http_server):
+    base = http_server(ImageHandler)
+    probe = make_probe()
+    url = f"{base}/new.png"
+    assert probe.status(url) is None  # 第一次只在后台开始检测
+    assert probe.wait(url, timeout=5) is True
+    ImageHandler.requests_seen = []
+    assert probe.status(url) is True
+    assert ImageHandler.requests_seen == []  # TTL 内直接读缓存，不再请求
+
+
+def test_negative_result_expires(http_server):
+    base = http_server(ImageHandler)
+    probe = make_probe(negative_ttl=0)
+    url = f"{base}/missing.png"
+    assert probe.wait(url, timeout=5) is False
+    assert probe.status(url) is False  # 过期后仍先返回上一次的结果，同时在后台重新检测
+    assert probe.wait(url, timeout=5) is False
+
+
+def test_clear_forgets_results_and_pending_checks(http_server):
+    base = http_server(ImageHandler)
+    probe = make_probe()
+    url = f"{base}/new.png"
+    assert probe.wait(url, timeout=5) is True
+    probe.status(f"{base}/slow.png")  # 还在检测中
+    probe.clear()
+    assert probe.status(url) is None  # 重新开始检测
+    assert probe.wait(url, timeout=5) is True
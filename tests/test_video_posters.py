@@ -0,0 +1,110 @@
+import io
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from video_posters import PosterStore
+
+
+def box(box_type, payload):
+    return (8 + len(payload)).to_bytes(4, "big") + box_type.encode("latin-1") + payload
+
+
+def u32(*values):
+    return b"".join(value.to_bytes(4, "big") for value in values)
+
+
+def jpeg_frame(shade):
+    output = io.BytesIO()
+    Image.new("RGB", (64, 36), (shade, 100, 255 - shade)).save(output, "JPEG")
+    return output.getvalue()
+
+
+def make_mp4(codec, frame_count=20):
+    """一条视频轨的 MP4：所有帧放在一个 chunk 里，codec 为 jpeg 时每帧是一张 JPEG"""
+    frames = [jpeg_frame(i * 10) if codec == "jpeg" else b"\x00" * 32 for i in range(frame_count)]
+
+    def moov(chunk_offset):
+        stbl = (
+            box("stsd", u32(0, 1) + box(codec, bytes(78)))
+            + box("stsz", u32(0, 0, len(frames)) + u32(*(len(frame) for frame in frames)))
+            + box("stsc", u32(0, 1, 1, len(frames), 1))
+            + box("stco", u32(0, 1, chunk_offset))
+        )
+        hdlr = box("hdlr", bytes(8) + b"vide" + bytes(12))
+        return box("moov", box("trak", box("mdia", hdlr + box("minf", box("stbl", stbl)))))
+
+    ftyp = box("ftyp", b"isom" + bytes(4) + b"isom")
+    header_size = len(ftyp) + len(moov(0)) + 8
+    return ftyp + moov(header_size) + box("mdat", b"".join(frames))
+
+
+class LocalMediaCache:
+    """代替本地音视频缓存：url 就是本地文件路径，已经“下载”好"""
+
+    def get(self, url):
+        return url if os.path.exists(url) else None
+
+    def is_pending(self, url):
+        return False
+
+    def wait(self, url, timeout=None):
+        return self.get(url)
+
+
+@pytest.fixture
+def write_video(tmp_path):
+    def write(name, codec):
+        path = tmp_path / name
+        path.write_bytes(make_mp4(codec))
+        return str(path)
+    return write
+
+
+def make_store(tmp_path, media_cache=None):
+    cache_dir = tmp_path / "posters"
+    cache_dir.mkdir(exist_ok=True)
+    return PosterStore(cache_dir=str(cache_dir), media_cache=media_cache)
+
+
+def test_frames_become_poster_and_sprite(tmp_path, write_video):
+    url = write_video("mjpeg.mp4", "jpeg")
+    store = make_store(tmp_path, LocalMediaCache())
+    assert store.get(url) is None  # 第一次只在后台开始生成
+    preview = store.wait(url, timeout=10)
+    assert os.path.exists(preview["poster"]) and os.path.exists(preview["sprite"])
+    # 索引写入磁盘，新实例直接读取
+    assert make_store(tmp_path, LocalMediaCache()).get(url) == preview
+
+
+def test_undecodable_video_has_no_poster_and_is_not_retried(tmp_path, write_video):
+    url = write_video("h264.mp4", "avc1")
+    store = make_store(tmp_path, LocalMediaCache())
+    assert store.wait(url, timeout=10) is None
+    assert store.get(url) is None
+    assert not store.is_pending(url)  # 记下了“取不到画面”，不会每次重跑都重新生成
+    assert [name for name in os.listdir(tmp_path / "posters") if name.endswith(".jpg")] == []
+
+
+def test_without_media_cache_nothing_is_generated(tmp_path, monkeypatch):
+    monkeypatch.setattr("video_posters.media_cache_enabled", lambda: False)
+    store = make_store(tmp_path)
+    url = "https://example.com/video.mp4"
+    assert store.get(url) is None
+    assert not store.is_pending(url)
+    assert store.wait(url, timeout=1) is None
+
+
+def test_wait_honours_timeout(tmp_path, write_video, monkeypatch):
+    url = write_video("slow.mp4", "jpeg")
+    store = make_store(tmp_path, LocalMediaCache())
+    release = threading.Event()
+    monkeypatch.setattr(store, "_generate", lambda video_path: release.wait(10) and None)
+    try:
+        with pytest.raises(TimeoutError):
+            store.wait(url, timeout=0.1)
+        assert store.is_pending(url)
+    finally:
+        release.set()
@@ -0,0 +1,115 @@
+"""页面主题：各页面的样式放在 themes/ 目录下的 CSS 文件里，由这里统一编译和注入
+
+同一组样式在每个进程里只编译一次：去掉注释、删除被后面同名选择器覆盖的声明和完全重复的规则、压缩空白，
+按内容哈希命名。每次重跑页面只发送这一个内容不变的样式元素（浏览器端不必重新计算样式）；
+开启 Streamlit 静态文件服务（server.enableStaticServing）时，只发送一个指向 static/ 下哈希文件名的 <link>，
+样式表本身由浏览器缓存。
+
+top.py 把全局样式和当前分区的样式编译成一份，每个页面只有一个样式元素。
+"""
+import hashlib
+import os
+import re
+import threading
+
+import streamlit as st
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+THEME_DIR = os.path.join(BASE_DIR, "themes")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+
+
+def _strip_comments(css):
+    return re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+
+
+def parse_rules(css):
+    """拆成 [(选择器, [(属性, 值, 是否!important)])]；样式文件里只有普通规则，不含 @media 等嵌套规则"""
+    rules = []
+    for selector, body in re.findall(r"([^{}]+)\{([^{}]*)\}", _strip_comments(css)):
+        declarations = []
+        for declaration in body.split(";"):
+            name, colon, value = declaration.partition(":")
+            if not colon or not name.strip():
+                continue
+            value = re.sub(r"\s*,\s*", ",", " ".join(value.split()))
+            important = value.endswith("!important")
+            if important:
+                value = value[:-len("!important")].strip()
+            declarations.append((name.strip().lower(), value, important))
+        selector = " ".join(selector.split())
+        selector = re.sub(r"\s*([,>+~])\s*", r"\1", selector)
+        rules.append((selector, declarations))
+    return rules
+
+
+def compile_rules(rules):
+    """删除不会生效的声明：同一选择器后面又声明了同一属性的（!important 规则除外），然后压缩输出"""
+    last_seen = {}  # (选择器, 属性) -> 最后一次声明所在规则的位置和是否 !important
+    for position, (selector, declarations) in enumerate(rules):
+        for name, _, important in declarations:
+            previous = last_seen.get((selector, name))
+            if previous is None or important or not previous[1]:
+                last_seen[(selector, name)] = (position, important)
+
+    output = []
+    for position, (selector, declarations) in enumerate(rules):
+        kept = {}
+        for name, value, important in declarations:
+            if last_seen[(selector, name)] != (position, important):
+                continue
+            kept.pop(name, None)  # 同一规则内重复的属性只保留最后一个
+            kept[name] = f"{name}:{value}{'!important' if important else ''}"
+        if kept:
+            output.append(f"{selector}{{{';'.join(kept.values())}}}")
+    return "".join(output)
+
+
+def _read_sheet(name):
+    with open(os.path.join(THEME_DIR, f"{name}.css"), encoding="utf-8") as f:
+        return f.read()
+
+
+_bundles = {}
+_bundles_lock = threading.Lock()
+
+
+def get_theme_bundle(sheets):
+    """编译一组样式（每个进程每种组合只编译一次），返回 (哈希, CSS)
+
+    sheets 为样式名（themes/<名>.css）的序列，按顺序合并，后面的样式覆盖前面的。
+    """
+    sheets = tuple(sheets)
+    with _bundles_lock:
+        if sheets not in _bundles:
+            rules = []
+            for name in sheets:
+                rules.extend(parse_rules(_read_sheet(name)))
+            css = compile_rules(rules)
+            _bundles[sheets] = (hashlib.sha1(css.encode("utf-8")).hexdigest()[:12], css)
+        return _bundles[sheets]
+
+
+def _static_url(digest, css):
+    """开启了静态文件服务时，把样式表写到 static/ 并返回地址；否则返回None"""
+    if not st.get_option("server.enableStaticServing"):
+        return None
+    file_name = f"theme-{digest}.css"
+    path = os.path.join(STATIC_DIR, file_name)
+    if not os.path.exists(path):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(css)
+        os.replace(tmp_path, path)
+    return f"app/static/{file_name}"
+
+
+def apply_theme(*sheets):
+    """注入页面样式：整页只调用一次，放在 st.set_page_config 之后"""
+    digest, css = get_theme_bundle(sheets)
+    url = _static_url(digest, css)
+    if url is not None:
+        st.markdown(f'<link rel="stylesheet" href="{url}">', unsafe_allow_html=True)
+    else:
+        st.markdown(f'<style id="theme-{digest}">{css}</style>', unsafe_allow_html=True)
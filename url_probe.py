@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from profiling import profiled
+
+HEAD_REJECTED_STATUS = (403, 405, 501)  # 不支持 HEAD 请求的服务器常见的返回码
+
+
+class UrlProbe:
+    """后台检测图片链接可用性：结果带TTL缓存，页面渲染只读取上一次的检测结果，从不等待网络"""
+
+    def __init__(self, ttl=600, negative_ttl=60, timeout=5, max_workers=4, session=None):
+        self.ttl = ttl  # 可用结果的缓存时间（秒）
+        self.negative_ttl = negative_ttl  # 不可用结果的缓存时间（秒），过期后重新检测
+        self.timeout = timeout
+        self._session = session or self._build_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="url-probe")
+        self._lock = threading.Lock()
+        self._results = {}  # url -> (是否可用, 检测时间)
+        self._pending = set()
+
+    @staticmethod
+    def _build_session(pool_size):
+        """复用连接池（keep-alive），避免每次检测都重新握手"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def check(self, url):
+        """同步检测一次链接，返回是否为可访问的图片
+
+        先发 HEAD；服务器不支持 HEAD（403/405/501）时改用只取第一个字节的 Range GET。
+        """
+        try:
+            response = self._session.head(url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code in HEAD_REJECTED_STATUS:
+                with self._session.get(
+                    url, headers={"Range": "bytes=0-0"}, timeout=self.timeout, allow_redirects=True, stream=True
+                ) as response:
+                    return response.status_code in (200, 206) and 'image' in response.headers.get('Content-Type', '')
+            return response.status_code == 200 and 'image' in response.headers.get('Content-Type', '')
+        except requests.RequestException:
+            return False
+
+    def _run_check(self, url):
+        result = self.check(url)
+        with self._lock:
+            self._results[url] = (result, time.monotonic())
+            self._pending.discard(url)
+        return result
+
+    def status(self, url):
+        """返回上一次的检测结果（True/False），从未检测过返回None；结果过期时在后台重新检测"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._results.get(url)
+            if cached is not None:
+                ok, checked_at = cached
+                if now - checked_at < (self.ttl if ok else self.negative_ttl):
+                    return ok
+            if url not in self._pending:
+                self._pending.add(url)
+                self._executor.submit(self._run_check, url)
+        return cached[0] if cached is not None else None
+
+    def wait(self, url, timeout=None):
+        """阻塞等待指定链接的检测结果（供脚本和测试使用，页面渲染不要调用）"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.status(url)
+        while True:
+            with self._lock:
+                if url not in self._pending and url in self._results:
+                    return self._results[url][0]
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+
+    def clear(self):
+        """清空所有缓存的检测结果（正在进行的检测完成后仍会写入结果）"""
+        with self._lock:
+            self._results.clear()
+            self._pending.clear()
+
+
+_default_probe = None
+_default_probe_lock = threading.Lock()
+
+
+def get_url_probe():
+    """进程内共享的检测服务，所有会话共用同一个缓存和连接池"""
+    global _default_probe
+    with _default_probe_lock:
+        if _default_probe is None:
+            _default_probe = UrlProbe()
+        return _default_probe
+
+
+@profiled("检测图片链接")
+def is_image_url_valid(url):
+    """检测图片链接是否可访问（非阻塞）：尚未得到检测结果时先按可用处理，由浏览器直接加载"""
+    status = get_url_probe().status(url)
+    return True if status is None else status
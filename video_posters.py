@@ -0,0 +1,313 @@
+"""剧集封面和预览图：后台线程生成，缓存在磁盘
+
+只用纯 Python 和 Pillow，不依赖外部服务或 ffmpeg。封面只来自视频本身，所以只在开启了本地音视频缓存
+（PET_HOME_MEDIA_PORT）且视频已缓存到本地时生成，按视频内容哈希缓存：
+    Motion-JPEG / PNG 编码的视频：按 MP4 采样表直接取出帧，生成封面和多帧预览拼图
+    其他编码（如 H.264，Pillow 无法解码）：使用文件内嵌的封面图；没有时不显示封面
+默认不下载视频，也就没有封面；标题、时长已经显示在剧集按钮和片源说明里，不再另画一张标题卡。
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from PIL import Image
+
+from app_cache import get_cache_dir
+from media_cache import get_media_cache, media_cache_enabled
+from media_manifest import find_box, iter_boxes
+
+POSTER_WIDTH = 320
+POSTER_SIZE = (320, 180)
+SPRITE_COLUMNS, SPRITE_ROWS = 5, 2
+SPRITE_TILE_WIDTH = 160
+POSTER_POSITION = 0.1  # 封面取视频10%处的画面，避开片头黑屏
+FRAME_CODECS = {"jpeg", "mjpa", "png "}  # Pillow 能直接解码的视频采样格式
+MAX_MOOV_BYTES = 16 * 1024 * 1024
+
+
+def read_moov(path):
+    """从本地 MP4 文件中读出完整的 moov box，找不到返回 None"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset + 8 <= size:
+            f.seek(offset)
+            header = f.read(16)
+            box_size = int.from_bytes(header[:4], "big")
+            if box_size == 1:
+                box_size = int.from_bytes(header[8:16], "big")
+            elif box_size == 0:
+                box_size = size - offset
+            if box_size < 8:
+                return None
+            if header[4:8] == b"moov":
+                if box_size > MAX_MOOV_BYTES:
+                    return None
+                f.seek(offset)
+                return f.read(box_size)
+            offset += box_size
+    return None
+
+
+def video_samples(moov):
+    """第一条视频轨道的编码和每一帧在文件中的 (偏移, 大小)"""
+    moov_box = find_box(moov, ["moov"])
+    if moov_box is None:
+        return None, []
+    for box_type, payload, box_end in iter_boxes(moov, *moov_box):
+        if box_type != "trak":
+            continue
+        hdlr = find_box(moov, ["mdia", "hdlr"], payload, box_end)
+        stbl = find_box(moov, ["mdia", "minf", "stbl"], payload, box_end)
+        if hdlr is None or stbl is None or moov[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+            continue
+        stsd = find_box(moov, ["stsd"], *stbl)
+        stsz = find_box(moov, ["stsz"], *stbl)
+        stsc = find_box(moov, ["stsc"], *stbl)
+        stco = find_box(moov, ["stco"], *stbl)
+        co64 = find_box(moov, ["co64"], *stbl)
+        if stsd is None or stsz is None or stsc is None or (stco is None and co64 is None):
+            return None, []
+        codec = moov[stsd[0] + 12:stsd[0] + 16].decode("latin-1")
+
+        def read_int(pos, width=4):
+            return int.from_bytes(moov[pos:pos + width], "big")
+
+        # stsz：统一大小，或每帧一个大小
+        uniform, count = read_int(stsz[0] + 4), read_int(stsz[0] + 8)
+        sizes = [uniform] * count if uniform else [read_int(stsz[0] + 12 + 4 * i) for i in range(count)]
+        # stco/co64：每个 chunk 在文件中的偏移
+        chunk_box, width = (stco, 4) if stco is not None else (co64, 8)
+        chunk_offsets = [read_int(chunk_box[0] + 8 + width * i, width) for i in range(read_int(chunk_box[0] + 4))]
+        # stsc：从第几个 chunk 开始，每个 chunk 有几帧
+        runs = [(read_int(stsc[0] + 8 + 12 * i), read_int(stsc[0] + 12 + 12 * i)) for i in range(read_int(stsc[0] + 4))]
+
+        samples = []
+        for run_no, (first_chunk, per_chunk) in enumerate(runs):
+            last_chunk = runs[run_no + 1][0] - 1 if run_no + 1 < len(runs) else len(chunk_offsets)
+            for chunk in range(first_chunk, last_chunk + 1):
+                offset = chunk_offsets[chunk - 1]
+                for _ in range(per_chunk):
+                    if len(samples) >= len(sizes):
+                        return codec, samples
+                    samples.append((offset, sizes[len(samples)]))
+                    offset += samples[-1][1]
+        return codec, samples
+    return None, []
+
+
+def extract_cover(moov):
+    """moov/udta/meta/ilst/covr 中内嵌的封面图字节，没有返回 None"""
+    meta = find_box(moov, ["moov", "udta", "meta"])
+    if meta is None:
+        return None
+    # meta 是带 version/flags 的 box，子 box 从第4个字节开始
+    data = find_box(moov, ["ilst", "covr", "data"], meta[0] + 4, meta[1])
+    if data is None:
+        return None
+    return moov[data[0] + 8:data[1]]  # data box：类型(4) + 区域(4) 之后是图片内容
+
+
+def _fit(img, width):
+    img = img.convert("RGB")
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def make_sprite(frames):
+    """把若干帧缩小后拼成一张 SPRITE_COLUMNS x SPRITE_ROWS 的预览图"""
+    tiles = [_fit(frame, SPRITE_TILE_WIDTH) for frame in frames]
+    tile_height = tiles[0].height
+    sheet = Image.new("RGB", (SPRITE_TILE_WIDTH * SPRITE_COLUMNS, tile_height * SPRITE_ROWS))
+    for i, tile in enumerate(tiles):
+        row, col = divmod(i, SPRITE_COLUMNS)
+        sheet.paste(tile, (col * SPRITE_TILE_WIDTH, row * tile_height))
+    return sheet
+
+
+def _save_poster(image, path):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    _fit(image, POSTER_WIDTH).save(tmp_path, "JPEG", quality=80)
+    os.replace(tmp_path, path)
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PosterStore:
+    """剧集封面和预览图：后台生成，按视频内容哈希缓存；页面只读取结果、从不等待"""
+
+    def __init__(self, cache_dir=None, media_cache=None, max_workers=1):
+        self.cache_dir = cache_dir or get_cache_dir(os.path.join("media", "posters"))
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        # 没开启本地音视频缓存时不下载任何视频，也不生成封面
+        if media_cache is None and media_cache_enabled():
+            media_cache = get_media_cache()
+        self.media_cache = media_cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="video-poster")
+        self._lock = threading.Lock()
+        self._pending = {}  # url -> Future
+        # 缓存文件名 -> {"size", "mtime_ns", "sha1", "poster", "sprite"}：文件没变就不必重新计算哈希
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def _paths(self, sha1):
+        return (os.path.join(self.cache_dir, f"{sha1}_poster.jpg"), os.path.join(self.cache_dir, f"{sha1}_sprite.jpg"))
+
+    def _generate(self, video_path):
+        """读取本地视频文件，写出封面（以及可能的预览图），返回索引记录；取不到画面时 poster 为 False"""
+        stat = os.stat(video_path)
+        sha1 = _file_sha1(video_path)
+        poster_path, sprite_path = self._paths(sha1)
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1, "poster": True, "sprite": False}
+        if os.path.exists(poster_path):
+            entry["sprite"] = os.path.exists(sprite_path)
+            return entry
+
+        moov = read_moov(video_path)
+        poster = None
+        if moov is not None:
+            codec, samples = video_samples(moov)
+            if codec in FRAME_CODECS and samples:
+                count = SPRITE_COLUMNS * SPRITE_ROWS
+                # 预览图在整段视频里均匀取帧；帧数太少时只做封面
+                sprite_picks = sorted({int(len(samples) * (i + 0.5) / count) for i in range(count)})
+                poster_pick = int(len(samples) * POSTER_POSITION)
+                frames = {}
+                with open(video_path, "rb") as f:
+                    for i in sorted(set(sprite_picks) | {poster_pick}):
+                        offset, size = samples[i]
+                        f.seek(offset)
+                        frames[i] = Image.open(io.BytesIO(f.read(size)))
+                        frames[i].load()
+                poster = frames[poster_pick]
+                if len(sprite_picks) == count:
+                    make_sprite([frames[i] for i in sprite_picks]).save(sprite_path, "JPEG", quality=80)
+                    entry["sprite"] = True
+            if poster is None:
+                cover = extract_cover(moov)
+                if cover:
+                    poster = Image.open(io.BytesIO(cover))
+        if poster is None:
+            entry["poster"] = False
+        else:
+            _save_poster(poster, poster_path)
+        return entry
+
+    def _run(self, url, video_path):
+        try:
+            entry = self._generate(video_path)
+        except Exception:
+            entry = None  # 文件损坏：保持没有封面，下次进程重启再试
+        with self._lock:
+            self._pending.pop(url, None)
+            if entry is not None:
+                self._entries[os.path.basename(video_path)] = entry
+                try:
+                    self._save()
+                except OSError:
+                    pass
+
+    def get(self, url):
+        """已生成时返回 {"poster": 路径, "sprite": 路径或None}；没有封面、还在下载或生成时返回None"""
+        if self.media_cache is None:
+            return None
+        video_path = self.media_cache.get(url)
+        if video_path is None:
+            return None
+        stat = os.stat(video_path)
+        with self._lock:
+            entry = self._entries.get(os.path.basename(video_path))
+            if entry is not None and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                if not entry.get("poster", True):
+                    return None  # 已经试过，这个视频取不到画面
+                poster_path, sprite_path = self._paths(entry["sha1"])
+                if os.path.exists(poster_path):
+                    return {"poster": poster_path, "sprite": sprite_path if entry["sprite"] else None}
+            if url not in self._pending:
+                self._pending[url] = self._executor.submit(self._run, url, video_path)
+        return None
+
+    def is_pending(self, url):
+        """视频正在下载或封面正在生成"""
+        with self._lock:
+            if url in self._pending:
+                return True
+        return self.media_cache is not None and self.media_cache.is_pending(url)
+
+    def wait(self, url, timeout=None):
+        """阻塞等待结果（供脚本和测试使用，页面渲染不要调用）；超过 timeout 秒时抛出 TimeoutError"""
+        if self.media_cache is None:
+            return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining():
+            return None if deadline is None else max(0, deadline - time.monotonic())
+
+        self.media_cache.wait(url, timeout=remaining())
+        self.get(url)
+        with self._lock:
+            future = self._pending.get(url)
+        if future is not None:
+            future.result(timeout=remaining())
+        return self.get(url)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_poster_store():
+    """进程内共享的封面缓存"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PosterStore()
+        return _default_store
+
+
+def render_episode_poster(video):
+    """剧集封面（有多帧预览时附带一个预览按钮）；还没生成时什么都不显示"""
+    preview = get_poster_store().get(video["url"])
+    if preview is None:
+        return
+    st.image(preview["poster"], use_container_width=True)
+    if preview["sprite"]:
+        with st.popover("🎞️ 预览"):
+            st.image(preview["sprite"])
+
+
+def refresh_when_posters_ready(videos, poll_interval=2.0):
+    """还有视频在下载或生成封面时，在局部片段里轮询；全部完成后整页刷新一次显示封面"""
+    store = get_poster_store()
+    urls = [video["url"] for video in videos]
+    if not any(store.is_pending(url) for url in urls):
+        return
+
+    def poster_watcher():
+        if not any(store.is_pending(url) for url in urls):
+            st.rerun()
+
+    st.fragment(poster_watcher, run_every=poll_interval)()